@@ -196,6 +196,7 @@ def main():
     print("\n📦 Running migrations...")
     execute_from_command_line(['manage.py', 'makemigrations'])
     execute_from_command_line(['manage.py', 'migrate'])
+    execute_from_command_line(['manage.py', 'createcachetable'])
     
     # Create lookups
     print("\n📋 Creating lookup data...")
@@ -114,8 +114,62 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Caches - 'default' is per process, 'shared' is visible to every gunicorn worker
+# (create its table with: python manage.py createcachetable)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'uat_tracker_cache',
+    },
+}
+
 # Note: Creatio integration is now configured through the admin panel
 
+# Creatio OAuth tokens are cached per company in this CACHES alias
+CREATIO_TOKEN_CACHE = config('CREATIO_TOKEN_CACHE', default='shared')
+
+# Keep-alive connections kept open per Creatio host in each company's pooled session
+CREATIO_POOL_SIZE = config('CREATIO_POOL_SIZE', default=10, cast=int)
+
+# Most requests a process sends to one Creatio tenant at the same time
+CREATIO_MAX_CONCURRENCY = config('CREATIO_MAX_CONCURRENCY', default=8, cast=int)
+
+# Seconds before preloaded Creatio priority/status/category tables are reloaded
+CREATIO_LOOKUP_TTL = config('CREATIO_LOOKUP_TTL', default=3600, cast=int)
+
+# Cases requested per page when pulling updates from Creatio
+CREATIO_PULL_PAGE_SIZE = config('CREATIO_PULL_PAGE_SIZE', default=500, cast=int)
+
+# Dashboard statistics cache - any alias from CACHES, results expire after the TTL (seconds)
+DASHBOARD_STATS_CACHE = config('DASHBOARD_STATS_CACHE', default='default')
+DASHBOARD_STATS_TTL = config('DASHBOARD_STATS_TTL', default=30, cast=int)
+
+# Lookup tables version stamp - shared across processes through this CACHES alias,
+# re-checked by each process at most every LOOKUPS_VERSION_CHECK_INTERVAL seconds
+LOOKUPS_VERSION_CACHE = config('LOOKUPS_VERSION_CACHE', default='shared')
+LOOKUPS_VERSION_CHECK_INTERVAL = config('LOOKUPS_VERSION_CHECK_INTERVAL', default=5, cast=int)
+
+# Case changes feed - entries younger than this many seconds are held back so a
+# transaction still committing with a lower change ID is never skipped
+CASE_CHANGES_SETTLE_SECONDS = config('CASE_CHANGES_SETTLE_SECONDS', default=2, cast=int)
+
+# Dynamic pages, menu items and widgets - payloads cached per role combination in this CACHES alias,
+# dropped whenever one of them changes (the TTL only bounds edits made outside the ORM)
+NAVIGATION_CACHE = config('NAVIGATION_CACHE', default='shared')
+NAVIGATION_CACHE_TTL = config('NAVIGATION_CACHE_TTL', default=3600, cast=int)
+
+# Live events stream - one poller thread per process tails the change log every EVENTS_POLL_INTERVAL
+# seconds and hands the new entries to the open streams; streams send a heartbeat comment when idle and
+# close after EVENTS_STREAM_TIMEOUT seconds. Each stream holds a server thread, so a process serves at most
+# EVENTS_MAX_STREAMS of them (keep it below the gunicorn --threads count) and answers 503 beyond that
+EVENTS_POLL_INTERVAL = config('EVENTS_POLL_INTERVAL', default=1, cast=float)
+EVENTS_HEARTBEAT_SECONDS = config('EVENTS_HEARTBEAT_SECONDS', default=15, cast=int)
+EVENTS_STREAM_TIMEOUT = config('EVENTS_STREAM_TIMEOUT', default=300, cast=int)
+EVENTS_MAX_STREAMS = config('EVENTS_MAX_STREAMS', default=12, cast=int)
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
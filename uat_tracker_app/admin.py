@@ -1,12 +1,13 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import (
     Company, UATCase, Note, Attachment, UserProfile, 
-    CreatioConfig, Priority, Status, Environment, CaseType
+    CreatioConfig, Priority, Status, Environment, CaseType, CaseStats, SyncOutbox
 )
 
 # Unregister the default User admin
@@ -145,7 +146,10 @@ class UATCaseAdmin(admin.ModelAdmin):
         'sync_status', 'created_at', 'assigned_to'
     )
     search_fields = ('case_number', 'subject', 'description', 'requestor__username', 'requestor__first_name', 'requestor__last_name')
-    readonly_fields = ('case_number', 'created_at', 'updated_at', 'last_synced')
+    readonly_fields = (
+        'case_number', 'created_at', 'updated_at', 'last_synced',
+        'notes_count', 'attachments_count', 'last_activity_at'
+    )
     date_hierarchy = 'created_at'
     inlines = [NoteInline, AttachmentInline]
     
@@ -168,7 +172,7 @@ class UATCaseAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Timestamps', {
-            'fields': ('created_at', 'updated_at'),
+            'fields': ('created_at', 'updated_at', 'last_activity_at', 'notes_count', 'attachments_count'),
             'classes': ('collapse',)
         })
     )
@@ -202,6 +206,32 @@ class UATCaseAdmin(admin.ModelAdmin):
         )
     get_sync_status.short_description = 'Sync Status'
 
+@admin.register(CaseStats)
+class CaseStatsAdmin(admin.ModelAdmin):
+    list_display = ('company', 'status', 'priority', 'sync_status', 'count')
+    list_filter = ('company', 'status', 'priority', 'sync_status')
+    readonly_fields = ('company', 'status', 'priority', 'sync_status', 'count')
+    
+    # Maintained by UATCase.save() and the rebuild_case_stats command
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(SyncOutbox)
+class SyncOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'case', 'operation', 'status', 'attempts', 'available_at', 'created_at')
+    list_filter = ('status', 'operation')
+    search_fields = ('case__case_number', 'last_error')
+    readonly_fields = ('case', 'operation', 'note', 'attempts', 'last_error', 'created_at')
+    actions = ['retry_entries']
+    
+    def retry_entries(self, request, queryset):
+        updated = queryset.update(status='pending', attempts=0, available_at=timezone.now())
+        self.message_user(request, f'{updated} outbox entries queued for retry')
+    retry_entries.short_description = 'Retry selected entries'
+
 @admin.register(Note)
 class NoteAdmin(admin.ModelAdmin):
     list_display = ('get_case_number', 'author', 'content_preview', 'created_at')
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class UatTrackerAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'uat_tracker_app'
\ No newline at end of file
+    name = 'uat_tracker_app'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
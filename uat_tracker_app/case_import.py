@@ -0,0 +1,156 @@
+from collections import Counter
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .lookups import get_lookup_registry
+from .models import UATCase, CaseChange, CaseStats, SyncOutbox
+import csv
+import json
+
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+TEXT_FIELDS = ('subject', 'description', 'reproduction_steps', 'expected_result', 'actual_result', 'creatio_id')
+REQUIRED_FIELDS = ('subject', 'description')
+# Lookup field -> value used when the row leaves it empty (None means required)
+LOOKUP_DEFAULTS = {
+    'priority': 'medium',
+    'status': 'new',
+    'environment': None,
+    'case_type': 'bug',
+}
+
+def parse_import_rows(lines, import_format):
+    """
+    Yield (line number, row) from text lines; a JSONL line that does not parse yields its error instead of a row
+    """
+    if import_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f'Invalid JSON: {e}')
+            continue
+        if not isinstance(row, dict):
+            row = ValueError('Expected a JSON object')
+        yield line_number, row
+
+def _text(row, field):
+    value = row.get(field)
+    return str(value).strip() if value is not None else ''
+
+def _datetime(row, field):
+    value = _text(row, field)
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f'Invalid {field}: {value}')
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+class CaseImporter:
+    """
+    Validates rows in memory and inserts valid ones chunk by chunk: one user query,
+    one case number allocation and one bulk_create each for cases, change log and outbox per chunk
+    """
+
+    def __init__(self, company, requestor, chunk_size=IMPORT_CHUNK_SIZE, queue_sync=True, dry_run=False):
+        self.company = company
+        self.requestor = requestor
+        self.chunk_size = chunk_size
+        self.queue_sync = queue_sync
+        self.dry_run = dry_run
+        self.registry = get_lookup_registry()
+        self.imported = 0
+        self.errors = []
+
+    def run(self, rows):
+        chunk = []
+        for line_number, row in rows:
+            chunk.append((line_number, row))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return self
+
+    def import_chunk(self, chunk):
+        usernames = {
+            _text(row, field) for _, row in chunk if isinstance(row, dict)
+            for field in ('requestor', 'assigned_to') if _text(row, field)
+        }
+        # Only users of the importing company; a row naming anyone else is rejected as unknown
+        user_ids = dict(User.objects.filter(
+            username__in=usernames, profile__company=self.company
+        ).values_list('username', 'id'))
+
+        cases = []
+        for line_number, row in chunk:
+            try:
+                cases.append(self.build_case(row, user_ids))
+            except ValueError as e:
+                self.errors.append((line_number, str(e)))
+
+        if cases and not self.dry_run:
+            with transaction.atomic():
+                for case, case_number in zip(cases, UATCase.allocate_case_numbers(len(cases))):
+                    case.case_number = case_number
+                UATCase.objects.bulk_create(cases)
+                CaseChange.record([CaseChange.for_case(case, 'case', case.id, event='case_created') for case in cases])
+                # bulk_create bypasses UATCase.save(), so statistics are moved here
+                CaseStats.apply_deltas(Counter(case.get_stats_bucket() for case in cases))
+                if self.queue_sync:
+                    SyncOutbox.objects.bulk_create([
+                        SyncOutbox(case=case, operation='create_case') for case in cases if not case.creatio_id
+                    ])
+        self.imported += len(cases)
+
+    def build_case(self, row, user_ids):
+        """
+        Validate one row and turn it into an unsaved case
+        """
+        if isinstance(row, Exception):
+            raise row
+
+        fields = {field: _text(row, field) or None for field in TEXT_FIELDS}
+        for field in REQUIRED_FIELDS:
+            if not fields[field]:
+                raise ValueError(f'{field} is required')
+        for field in TEXT_FIELDS:
+            max_length = UATCase._meta.get_field(field).max_length
+            if max_length and fields[field] and len(fields[field]) > max_length:
+                raise ValueError(f'{field} is longer than {max_length} characters')
+
+        for field, default in LOOKUP_DEFAULTS.items():
+            value = _text(row, field) or (_text(row, 'type') if field == 'case_type' else '') or default
+            if not value:
+                raise ValueError(f'{field} is required')
+            entry = self.registry.get_by_value(field, value)
+            if entry is None:
+                raise ValueError(f'Unknown {field}: {value}')
+            fields[f'{field}_id'] = entry.id
+
+        for field, default in (('requestor', self.requestor.id), ('assigned_to', None)):
+            username = _text(row, field)
+            if username and username not in user_ids:
+                raise ValueError(f'Unknown {field}: {username}')
+            fields[f'{field}_id'] = user_ids[username] if username else default
+
+        created_at = _datetime(row, 'created_at') or timezone.now()
+        return UATCase(
+            company_id=self.company.id,
+            created_at=created_at,
+            last_activity_at=created_at,
+            due_date=_datetime(row, 'due_date'),
+            sync_status='synced' if fields['creatio_id'] else 'pending',
+            **fields
+        )
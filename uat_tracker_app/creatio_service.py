@@ -1,6 +1,11 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import hashlib
+import threading
+import time
 from django.conf import settings
+from django.core.cache import caches
 from django.utils import timezone
 from datetime import datetime, timedelta
 from cryptography.fernet import Fernet
@@ -8,6 +13,96 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Tokens are treated as expired this long before the identity service says so (at most a quarter of their lifetime)
+TOKEN_EXPIRY_MARGIN = timedelta(minutes=5)
+# Tokens closer than this to expiry are renewed in the background (at most half of their lifetime)
+TOKEN_REFRESH_AHEAD = timedelta(minutes=10)
+# Longest a worker holds (or waits on) the cross-process refresh lock, in seconds
+TOKEN_LOCK_TIMEOUT = 35
+
+_token_locks = {}
+_token_locks_guard = threading.Lock()
+_background_refreshes = set()
+
+_sessions = {}
+_tenant_slots = {}
+_sessions_guard = threading.Lock()
+
+# Creatio lookup tables preloaded per company for name -> Id resolution
+LOOKUP_SCHEMAS = ('CasePriority', 'CaseStatus', 'CaseCategory')
+# Minimum age, in seconds, before a lookup miss may reload the tables
+LOOKUP_MISS_REFRESH_INTERVAL = 60
+
+_lookup_tables = {}
+_lookup_locks = {}
+_lookup_locks_guard = threading.Lock()
+
+def token_windows(lifetime):
+    """
+    (expiry margin, refresh-ahead window) of a token valid for lifetime seconds, shrunk for
+    short-lived tokens so they are not renewed on every call
+    """
+    lifetime = timedelta(seconds=lifetime)
+    return min(TOKEN_EXPIRY_MARGIN, lifetime / 4), min(TOKEN_REFRESH_AHEAD, lifetime / 2)
+
+def get_session(company=None):
+    """
+    Process-wide pooled keep-alive HTTP session for a company's Creatio traffic
+    """
+    key = company.id if company else 'default'
+    with _sessions_guard:
+        session = _sessions.get(key)
+        if session is None:
+            pool_size = getattr(settings, 'CREATIO_POOL_SIZE', 10)
+            # Separate pools per host (Creatio instance, identity service), each keeping pool_size connections alive
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update({
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive',
+            })
+            _sessions[key] = session
+        return session
+
+def get_tenant_slots(company=None):
+    """
+    Process-wide semaphore capping concurrent requests to a company's Creatio tenant
+    """
+    key = company.id if company else 'default'
+    with _sessions_guard:
+        slots = _tenant_slots.get(key)
+        if slots is None:
+            slots = threading.BoundedSemaphore(getattr(settings, 'CREATIO_MAX_CONCURRENCY', 8))
+            _tenant_slots[key] = slots
+        return slots
+
+def get_transport_metrics():
+    """
+    Connection reuse per pooled session: requests sent vs. connections (TCP+TLS handshakes) opened
+    """
+    with _sessions_guard:
+        sessions = list(_sessions.items())
+    
+    metrics = {}
+    for key, session in sessions:
+        requests_sent = 0
+        connections_opened = 0
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is not None:
+                    requests_sent += pool.num_requests
+                    connections_opened += pool.num_connections
+        metrics[key] = {
+            'requests': requests_sent,
+            'connections_opened': connections_opened,
+            'connections_reused': max(requests_sent - connections_opened, 0),
+        }
+    return metrics
+
 class CreatioService:
     """
     Service class for integrating with Creatio CRM using OAuth 2.0 client credentials
@@ -18,7 +113,8 @@ class CreatioService:
         self.config = None
         self.access_token = None
         self.token_expires_at = None
-        self.session = requests.Session()
+        self.token_lifetime = None
+        self.session = get_session(company)
         
         if company:
             try:
@@ -62,20 +158,142 @@ class CreatioService:
                 'client_secret': getattr(settings, 'CREATIO_CLIENT_SECRET', ''),
             }
     
+    def _token_cache(self):
+        """
+        Cache shared by all service instances (and workers, with a shared backend) for OAuth tokens
+        """
+        return caches[getattr(settings, 'CREATIO_TOKEN_CACHE', 'default')]
+    
+    def _token_cache_key(self, config):
+        """
+        Token cache key per company and OAuth client
+        """
+        client = hashlib.sha256(f"{config['identity_service_url']}|{config['client_id']}".encode()).hexdigest()[:16]
+        company_id = self.company.id if self.company else 'default'
+        return f"creatio-token:{company_id}:{client}"
+    
+    def _use_token(self, token):
+        """
+        Adopt a cached token if it is still usable, returning it or None
+        """
+        if not token:
+            return None
+        expires_at = datetime.fromtimestamp(token['expires_at'])
+        lifetime = token.get('expires_in', 3600)
+        if datetime.now() >= expires_at - token_windows(lifetime)[0]:
+            return None
+        self.access_token = token['access_token']
+        self.token_expires_at = expires_at
+        self.token_lifetime = lifetime
+        return self.access_token
+    
     def get_access_token(self):
         """
-        Get OAuth access token using client credentials flow
+        Get OAuth access token using client credentials flow, shared per company through the token cache
         """
-        # Check if we have a valid token
-        if (self.access_token and self.token_expires_at and 
-            datetime.now() < self.token_expires_at - timedelta(minutes=5)):
-            return self.access_token
-        
         config = self._get_config_values()
         
         if not all([config['identity_service_url'], config['client_id'], config['client_secret']]):
             raise Exception("Creatio OAuth configuration is incomplete. Please check client_id and client_secret.")
         
+        # Check if we (or another service instance) have a valid token
+        if not (self.access_token and self.token_expires_at and
+                datetime.now() < self.token_expires_at - token_windows(self.token_lifetime)[0]):
+            key = self._token_cache_key(config)
+            if not self._use_token(self._token_cache().get(key)):
+                return self._refresh_access_token(config, key)
+        
+        # Renew in the background shortly before expiry so requests never wait on the identity service
+        if datetime.now() >= self.token_expires_at - token_windows(self.token_lifetime)[1]:
+            self._refresh_in_background(config)
+        return self.access_token
+    
+    def _refresh_access_token(self, config, key, force=False):
+        """
+        Single-flight token refresh: one thread per process and one process per company
+        talks to the identity service, everyone else waits for its result
+        """
+        with _token_locks_guard:
+            local_lock = _token_locks.setdefault(key, threading.Lock())
+        
+        with local_lock:
+            cache = self._token_cache()
+            token = None if force else self._use_token(cache.get(key))
+            if token:
+                return token
+            
+            lock_key = f"{key}:lock"
+            locked = cache.add(lock_key, True, TOKEN_LOCK_TIMEOUT)
+            if not locked:
+                # Another worker is refreshing - wait for it to publish the new token
+                deadline = time.monotonic() + TOKEN_LOCK_TIMEOUT
+                while time.monotonic() < deadline:
+                    time.sleep(0.1)
+                    token = self._use_token(cache.get(key))
+                    if token:
+                        return token
+                logger.warning("Timed out waiting for OAuth token refresh, requesting a token directly")
+            
+            try:
+                access_token, expires_in = self._request_access_token(config)
+                expires_at = datetime.now() + timedelta(seconds=expires_in)
+                cache.set(
+                    key,
+                    {'access_token': access_token, 'expires_at': expires_at.timestamp(), 'expires_in': expires_in},
+                    expires_in
+                )
+                self.access_token = access_token
+                self.token_expires_at = expires_at
+                self.token_lifetime = expires_in
+                return access_token
+            finally:
+                # After a timed-out wait the lock belongs to the other worker
+                if locked:
+                    cache.delete(lock_key)
+    
+    def _refresh_in_background(self, config):
+        """
+        Start a proactive token refresh unless one is already running for this company
+        """
+        key = self._token_cache_key(config)
+        with _token_locks_guard:
+            if key in _background_refreshes:
+                return
+            _background_refreshes.add(key)
+        
+        def refresh():
+            try:
+                cache = self._token_cache()
+                token = cache.get(key)
+                # Skip if another worker already renewed the token
+                refresh_ahead = token_windows(token.get('expires_in', 3600))[1] if token else None
+                if token and datetime.fromtimestamp(token['expires_at']) - refresh_ahead > datetime.now():
+                    return
+                self._refresh_access_token(config, key, force=True)
+            except Exception as e:
+                logger.error(f"Background OAuth token refresh failed: {e}")
+            finally:
+                with _token_locks_guard:
+                    _background_refreshes.discard(key)
+        
+        threading.Thread(target=refresh, name=f"creatio-token-refresh-{key}", daemon=True).start()
+    
+    def _invalidate_token(self):
+        """
+        Forget the current token locally and in the shared token cache
+        """
+        self.access_token = None
+        self.token_expires_at = None
+        self.token_lifetime = None
+        try:
+            self._token_cache().delete(self._token_cache_key(self._get_config_values()))
+        except Exception as e:
+            logger.error(f"Failed to invalidate cached OAuth token: {e}")
+    
+    def _request_access_token(self, config):
+        """
+        Request a new token from the identity service, returning (access_token, expires_in)
+        """
         # OAuth 2.0 client credentials flow
         token_url = f"{config['identity_service_url']}/connect/token"
         
@@ -90,17 +308,16 @@ class CreatioService:
         }
         
         try:
-            response = requests.post(token_url, headers=headers, data=data, timeout=30)
+            response = self.session.post(token_url, headers=headers, data=data, timeout=30)
             response.raise_for_status()
             
             token_data = response.json()
             
-            self.access_token = token_data.get('access_token')
+            access_token = token_data['access_token']
             expires_in = token_data.get('expires_in', 3600)  # Default to 1 hour
-            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in)
             
             logger.info("Successfully obtained OAuth access token")
-            return self.access_token
+            return access_token, expires_in
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to get OAuth token: {e}")
@@ -122,7 +339,10 @@ class CreatioService:
         config = self._get_config_values()
         
         # Build URL based on service type
-        if service_type == 'odata':
+        if endpoint.startswith(('http://', 'https://')):
+            # Absolute links handed out by Creatio, e.g. @odata.nextLink
+            url = endpoint
+        elif service_type == 'odata':
             url = f"{config['base_url']}/0/odata/{endpoint}"
         elif service_type == 'dataservice':
             url = f"{config['base_url']}/0/DataService/json/SyncReply/{endpoint}"
@@ -143,18 +363,17 @@ class CreatioService:
         headers['BPMCSRF'] = csrf_token
         
         try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=headers, params=params or data, timeout=30)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=headers, json=data, timeout=30)
-            elif method.upper() == 'PUT':
-                response = requests.put(url, headers=headers, json=data, timeout=30)
-            elif method.upper() == 'PATCH':
-                response = requests.patch(url, headers=headers, json=data, timeout=30)
-            elif method.upper() == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=30)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+            method = method.upper()
+            # Bound the number of requests in flight against this tenant
+            with get_tenant_slots(self.company):
+                if method == 'GET':
+                    response = self.session.get(url, headers=headers, params=params or data, timeout=30)
+                elif method in ('POST', 'PUT', 'PATCH'):
+                    response = self.session.request(method, url, headers=headers, json=data, timeout=30)
+                elif method == 'DELETE':
+                    response = self.session.delete(url, headers=headers, timeout=30)
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
             
             response.raise_for_status()
             
@@ -170,14 +389,13 @@ class CreatioService:
         except requests.exceptions.RequestException as e:
             logger.error(f"Creatio API request failed: {e}")
             # If authentication failed, reset token
-            if hasattr(e, 'response') and e.response and e.response.status_code in [401, 403]:
-                self.access_token = None
-                self.token_expires_at = None
+            if hasattr(e, 'response') and e.response is not None and e.response.status_code in [401, 403]:
+                self._invalidate_token()
             raise Exception(f"Creatio API request failed: {e}")
     
-    def create_case(self, case_data):
+    def _build_insert_query(self, case_data):
         """
-        Create a case in Creatio using DataService
+        DataService InsertQuery creating a Creatio case from our case data
         """
         # Map our case data to Creatio case structure
         creatio_case = {
@@ -195,13 +413,59 @@ class CreatioService:
         # Remove None values
         creatio_case = {k: v for k, v in creatio_case.items() if v is not None}
         
+        return {
+            'rootSchemaName': 'Case',
+            'operationType': 0,  # Insert operation
+            'columnValues': creatio_case
+        }
+    
+    def _build_update_query(self, creatio_id, case_data):
+        """
+        DataService UpdateQuery applying our case data to an existing Creatio case
+        """
+        # Map our case data to Creatio case structure
+        creatio_case = {
+            'Subject': case_data.get('subject'),
+            'Description': case_data.get('description'),
+            'Symptoms': case_data.get('reproduction_steps', ''),
+            'PriorityId': self._get_priority_id(case_data.get('priority')),
+            'StatusId': self._get_status_id(case_data.get('status')),
+            'CategoryId': self._get_category_id(case_data.get('case_type')),
+        }
+        
+        # Remove None values
+        creatio_case = {k: v for k, v in creatio_case.items() if v is not None}
+        
+        return {
+            'rootSchemaName': 'Case',
+            'operationType': 1,  # Update operation
+            'filters': {
+                'filterType': 1,
+                'comparisonType': 3,
+                'isEnabled': True,
+                'trimDateTimeParameterToDate': False,
+                'leftExpression': {
+                    'expressionType': 0,
+                    'columnPath': 'Id'
+                },
+                'rightExpression': {
+                    'expressionType': 2,
+                    'parameter': {
+                        'dataValueType': 0,
+                        'value': creatio_id
+                    }
+                }
+            },
+            'columnValues': creatio_case
+        }
+    
+    def create_case(self, case_data):
+        """
+        Create a case in Creatio using DataService
+        """
         try:
             # Use DataService for creating records
-            insert_query = {
-                'rootSchemaName': 'Case',
-                'operationType': 0,  # Insert operation
-                'columnValues': creatio_case
-            }
+            insert_query = self._build_insert_query(case_data)
             
             result = self.make_authenticated_request('POST', 'InsertQuery', insert_query, 'dataservice')
             
@@ -221,43 +485,9 @@ class CreatioService:
         """
         Update a case in Creatio using DataService
         """
-        # Map our case data to Creatio case structure
-        creatio_case = {
-            'Subject': case_data.get('subject'),
-            'Description': case_data.get('description'),
-            'Symptoms': case_data.get('reproduction_steps', ''),
-            'PriorityId': self._get_priority_id(case_data.get('priority')),
-            'StatusId': self._get_status_id(case_data.get('status')),
-            'CategoryId': self._get_category_id(case_data.get('case_type')),
-        }
-        
-        # Remove None values
-        creatio_case = {k: v for k, v in creatio_case.items() if v is not None}
-        
         try:
             # Use DataService for updating records
-            update_query = {
-                'rootSchemaName': 'Case',
-                'operationType': 1,  # Update operation
-                'filters': {
-                    'filterType': 1,
-                    'comparisonType': 3,
-                    'isEnabled': True,
-                    'trimDateTimeParameterToDate': False,
-                    'leftExpression': {
-                        'expressionType': 0,
-                        'columnPath': 'Id'
-                    },
-                    'rightExpression': {
-                        'expressionType': 2,
-                        'parameter': {
-                            'dataValueType': 0,
-                            'value': creatio_id
-                        }
-                    }
-                },
-                'columnValues': creatio_case
-            }
+            update_query = self._build_update_query(creatio_id, case_data)
             
             result = self.make_authenticated_request('POST', 'UpdateQuery', update_query, 'dataservice')
             
@@ -272,6 +502,45 @@ class CreatioService:
             logger.error(f"Failed to update case in Creatio: {e}")
             raise
     
+    def push_cases_batch(self, operations):
+        """
+        Create and update many cases with a single DataService BatchQuery.
+        
+        operations is a list of (creatio_id, case_data) pairs - a case without a
+        creatio_id is inserted, otherwise updated. Returns one result per operation,
+        in order: {'success': True, 'Id': ...} or {'success': False, 'error': ...}.
+        """
+        items = []
+        for creatio_id, case_data in operations:
+            if creatio_id:
+                query = self._build_update_query(creatio_id, case_data)
+                query['__type'] = 'Terrasoft.Nui.ServiceModel.DataContract.UpdateQuery'
+            else:
+                query = self._build_insert_query(case_data)
+                query['__type'] = 'Terrasoft.Nui.ServiceModel.DataContract.InsertQuery'
+            items.append(query)
+        
+        try:
+            result = self.make_authenticated_request('POST', 'BatchQuery', {'items': items}, 'dataservice')
+        except Exception as e:
+            logger.error(f"Creatio batch request failed: {e}")
+            raise
+        
+        query_results = result.get('queryResults') or []
+        results = []
+        for index, (creatio_id, case_data) in enumerate(operations):
+            item = query_results[index] if index < len(query_results) else {}
+            if item.get('success'):
+                results.append({'success': True, 'Id': creatio_id or item.get('id')})
+            else:
+                error_msg = (item.get('errorInfo') or {}).get('message', 'No result returned for batch item')
+                results.append({'success': False, 'error': error_msg})
+        
+        logger.info(
+            f"Creatio batch pushed {sum(r['success'] for r in results)} of {len(results)} cases"
+        )
+        return results
+    
     def get_case(self, creatio_id):
         """
         Get a case from Creatio using DataService
@@ -342,83 +611,147 @@ class CreatioService:
             logger.error(f"Failed to add comment to case in Creatio: {e}")
             raise
     
-    def sync_cases_from_creatio(self, last_sync_time=None):
+    def iter_case_pages(self, last_sync_time=None, page_size=None):
         """
-        Pull updated cases from Creatio
+        Pull updated cases from Creatio one page at a time.
+        
+        Follows @odata.nextLink when the server pages the result, otherwise pages
+        with $top/$skip, also when the server caps pages below $top. Only the columns
+        we map are fetched; the Status and Priority lookups are flattened to their names.
         """
-        params = {}
+        page_size = page_size or getattr(settings, 'CREATIO_PULL_PAGE_SIZE', 500)
+        params = {
+            '$select': 'Id,Subject,Description,ModifiedOn',
+            '$expand': 'Status($select=Name),Priority($select=Name)',
+            '$orderby': 'ModifiedOn,Id',
+            '$top': page_size,
+        }
         if last_sync_time:
             params['$filter'] = f"ModifiedOn gt {last_sync_time.isoformat()}"
         
+        endpoint = 'Case'
+        skip = 0
+        # Rows the server actually returns per page, unknown until the first page arrives
+        server_page_size = None
         try:
-            result = self.make_authenticated_request('GET', 'Case', params=params)
-            return result.get('value', [])
+            while True:
+                result = self.make_authenticated_request('GET', endpoint, params=params)
+                rows = result.get('value', [])
+                if rows:
+                    yield [self._flatten_case(row) for row in rows]
+                
+                next_link = result.get('@odata.nextLink')
+                if next_link:
+                    endpoint, params = next_link, None
+                elif not rows or endpoint != 'Case' or (server_page_size and len(rows) < server_page_size):
+                    return
+                else:
+                    # A short first page may be the server's own page cap rather than the end
+                    # of the result, so only a page shorter than the first one ends the pull
+                    server_page_size = server_page_size or len(rows)
+                    skip += len(rows)
+                    params['$skip'] = skip
         except Exception as e:
             logger.error(f"Failed to sync cases from Creatio: {e}")
             raise
     
-    def _get_priority_id(self, priority_name):
+    def sync_cases_from_creatio(self, last_sync_time=None):
         """
-        Get Creatio priority ID by name
+        Pull updated cases from Creatio, yielding them one by one
         """
-        if not priority_name:
-            return None
+        for page in self.iter_case_pages(last_sync_time):
+            yield from page
+    
+    def _flatten_case(self, row):
+        """
+        Replace expanded lookups ({'Name': ...}) with their names
+        """
+        for lookup in ('Status', 'Priority'):
+            if isinstance(row.get(lookup), dict):
+                row[lookup] = row[lookup].get('Name')
+        return row
+    
+    def _load_lookup_table(self, schema):
+        """
+        Fetch a whole Creatio lookup table as {lowercased name: Id}
+        """
+        result = self.make_authenticated_request('GET', schema, params={'$select': 'Id,Name'})
+        return {
+            row['Name'].strip().lower(): row['Id']
+            for row in result.get('value', [])
+            if row.get('Name')
+        }
+    
+    def _get_lookup_tables(self, force=False):
+        """
+        Creatio lookup tables for this company, loaded once and reloaded after CREATIO_LOOKUP_TTL seconds
+        """
+        key = self.company.id if self.company else 'default'
+        with _lookup_locks_guard:
+            lock = _lookup_locks.setdefault(key, threading.Lock())
         
-        try:
-            # Use OData filter with startswith function
-            filter_param = f"startswith(Name,'{priority_name}')"
-            result = self.make_authenticated_request('GET', 'CasePriority', params={'$filter': filter_param})
+        with lock:
+            entry = _lookup_tables.get(key)
+            age = time.monotonic() - entry['loaded_at'] if entry else None
+            if entry and not force and age < getattr(settings, 'CREATIO_LOOKUP_TTL', 3600):
+                return entry['tables']
+            # A miss only reloads tables that have not just been loaded
+            if entry and force and age < LOOKUP_MISS_REFRESH_INTERVAL:
+                return entry['tables']
             
-            if result.get('value') and len(result['value']) > 0:
-                return result['value'][0]['Id']
-            else:
-                logger.warning(f"Priority '{priority_name}' not found in Creatio")
-                return None
-        except Exception as e:
-            logger.error(f"Failed to get priority ID: {e}")
-            return None
+            tables = {schema: self._load_lookup_table(schema) for schema in LOOKUP_SCHEMAS}
+            _lookup_tables[key] = {'tables': tables, 'loaded_at': time.monotonic()}
+            logger.info(f"Loaded Creatio lookup tables for company {key}")
+            return tables
     
-    def _get_status_id(self, status_name):
+    def _find_lookup_id(self, table, name):
         """
-        Get Creatio status ID by name
+        Resolve a name exactly, falling back to the first name it is a prefix of
+        """
+        if name in table:
+            return table[name]
+        for lookup_name, lookup_id in table.items():
+            if lookup_name.startswith(name):
+                return lookup_id
+        return None
+    
+    def _get_lookup_id(self, schema, name):
         """
-        if not status_name:
+        Get a Creatio lookup ID by name from the cached lookup tables
+        """
+        if not name:
             return None
         
+        name = str(name).strip().lower()
         try:
-            # Use OData filter with startswith function
-            filter_param = f"startswith(Name,'{status_name}')"
-            result = self.make_authenticated_request('GET', 'CaseStatus', params={'$filter': filter_param})
-            
-            if result.get('value') and len(result['value']) > 0:
-                return result['value'][0]['Id']
-            else:
-                logger.warning(f"Status '{status_name}' not found in Creatio")
-                return None
+            lookup_id = self._find_lookup_id(self._get_lookup_tables()[schema], name)
+            if lookup_id is None:
+                # The table may have changed in Creatio since we loaded it
+                lookup_id = self._find_lookup_id(self._get_lookup_tables(force=True)[schema], name)
+            if lookup_id is None:
+                logger.warning(f"{schema} '{name}' not found in Creatio")
+            return lookup_id
         except Exception as e:
-            logger.error(f"Failed to get status ID: {e}")
+            logger.error(f"Failed to get {schema} ID: {e}")
             return None
     
+    def _get_priority_id(self, priority_name):
+        """
+        Get Creatio priority ID by name
+        """
+        return self._get_lookup_id('CasePriority', priority_name)
+    
+    def _get_status_id(self, status_name):
+        """
+        Get Creatio status ID by name
+        """
+        return self._get_lookup_id('CaseStatus', status_name)
+    
     def _get_category_id(self, category_name):
         """
         Get Creatio category ID by name
         """
-        if not category_name:
-            return None
-        
-        try:
-            # Use OData filter with startswith function
-            filter_param = f"startswith(Name,'{category_name}')"
-            result = self.make_authenticated_request('GET', 'CaseCategory', params={'$filter': filter_param})
-            
-            if result.get('value') and len(result['value']) > 0:
-                return result['value'][0]['Id']
-            else:
-                logger.warning(f"Category '{category_name}' not found in Creatio")
-                return None
-        except Exception as e:
-            logger.error(f"Failed to get category ID: {e}")
-            return None
+        return self._get_lookup_id('CaseCategory', category_name)
     
     def test_connection(self):
         """
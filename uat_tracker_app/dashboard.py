@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+from .lookups import get_lookup
+from .models import UATCase, CaseStats
+from .serializers import RECENT_ACTIVITY_SERIALIZER
+
+OPEN_STATUSES = ('new', 'in-progress', 'reopened')
+RECENT_ACTIVITY_LIMIT = 10
+BUCKET_FIELDS = ('sync_status', 'status_id', 'priority_id')
+
+def _stats_cache():
+    """
+    Cache backend holding dashboard results (any alias from settings.CACHES)
+    """
+    return caches[getattr(settings, 'DASHBOARD_STATS_CACHE', 'default')]
+
+def _cache_key(user, user_profile):
+    """
+    Admins share one entry per company, regular users get their own entry
+    """
+    if user_profile.is_admin:
+        return f'dashboard-stats:company:{user_profile.company_id}'
+    return f'dashboard-stats:user:{user.id}'
+
+def get_scoped_cases(user, user_profile):
+    """
+    Cases visible on the dashboard - the whole company for admins, own cases otherwise
+    """
+    if user_profile.is_admin:
+        return UATCase.objects.filter(company=user_profile.company_id)
+    return UATCase.objects.filter(requestor=user)
+
+def get_stats_buckets(user, user_profile):
+    """
+    Case counts per (status, priority, sync status) bucket - read from the
+    materialized CaseStats table for company scope, grouped from UATCase otherwise
+    """
+    if user_profile.is_admin:
+        return CaseStats.objects.filter(
+            company=user_profile.company_id, count__gt=0
+        ).values(*BUCKET_FIELDS, 'count')
+    return UATCase.objects.filter(requestor=user).values(
+        *BUCKET_FIELDS
+    ).annotate(count=Count('id')).order_by()
+
+def compute_stats(buckets):
+    """
+    Compute every dashboard counter and chart distribution from the case count buckets,
+    with lookup names and colors taken from the lookup registry
+    """
+    status_counts = {}
+    priority_counts = {}
+    total_cases = 0
+    pending_sync = 0
+
+    def add(counts, lookup, count):
+        row = counts.setdefault(lookup.value, {
+            'name': lookup.name,
+            'color': lookup.color,
+            'order': lookup.order,
+            'is_active': lookup.is_active,
+            'value': 0,
+        })
+        row['value'] += count
+
+    for bucket in buckets:
+        count = bucket['count']
+        total_cases += count
+        if bucket['sync_status'] == 'pending':
+            pending_sync += count
+
+        add(status_counts, get_lookup('status', bucket['status_id']), count)
+        add(priority_counts, get_lookup('priority', bucket['priority_id']), count)
+
+    def count_for(counts, value):
+        return counts[value]['value'] if value in counts else 0
+
+    def distribution(counts):
+        rows = sorted(
+            (row for row in counts.values() if row['is_active']),
+            key=lambda row: (row['order'], row['name'])
+        )
+        return [{'name': row['name'], 'value': row['value'], 'color': row['color']} for row in rows]
+
+    return {
+        'total_cases': total_cases,
+        'new_cases': count_for(status_counts, 'new'),
+        'in_progress_cases': count_for(status_counts, 'in-progress'),
+        'resolved_cases': count_for(status_counts, 'resolved'),
+        'closed_cases': count_for(status_counts, 'closed'),
+        'cancelled_cases': count_for(status_counts, 'cancelled'),
+        'reopened_cases': count_for(status_counts, 'reopened'),
+        'high_priority': count_for(priority_counts, 'high'),
+        'pending_sync': pending_sync,
+        'open_cases': sum(count_for(status_counts, value) for value in OPEN_STATUSES),
+        'status_distribution': distribution(status_counts),
+        'priority_distribution': distribution(priority_counts),
+    }
+
+def compute_recent_activity(cases, limit=RECENT_ACTIVITY_LIMIT):
+    """
+    Most recently updated cases as values() rows, with user names joined in the same query
+    and lookup names and colors from the registry
+    """
+    return RECENT_ACTIVITY_SERIALIZER.serialize(
+        RECENT_ACTIVITY_SERIALIZER.values(cases).order_by('-updated_at')[:limit]
+    )
+
+def get_dashboard_payload(user, user_profile):
+    """
+    Dashboard payload for a user, served from the stats cache for up to DASHBOARD_STATS_TTL seconds
+    """
+    cache = _stats_cache()
+    key = _cache_key(user, user_profile)
+
+    payload = cache.get(key)
+    if payload is None:
+        payload = {
+            'stats': compute_stats(get_stats_buckets(user, user_profile)),
+            'recent_activity': compute_recent_activity(get_scoped_cases(user, user_profile)),
+        }
+        cache.set(key, payload, getattr(settings, 'DASHBOARD_STATS_TTL', 30))
+    return payload
@@ -0,0 +1,188 @@
+from collections import namedtuple
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from datetime import timedelta
+from .models import CaseChange
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PAGE_SIZE = 500
+# Settled change log entries kept in memory; streams further behind catch up from the database
+EVENTS_BUFFER_SIZE = 5000
+# Milliseconds a client waits before reconnecting after the stream closes
+EVENTS_RETRY_MS = 3000
+
+# Change log columns the poller keeps for the streams
+Change = namedtuple('Change', [
+    'id', 'company_id', 'requestor_id', 'case_id', 'object_type', 'object_id', 'action', 'event'
+])
+
+# Shared by every open stream of this process: buffer holds each settled entry with floor < id <= latest_id
+_state = {'latest_id': None, 'floor': 0, 'buffer': [], 'streams': 0, 'poller': None}
+_changed = threading.Condition()
+
+def poll_changes():
+    """
+    Read the change log entries settled since the last poll into the buffer and wake the streams
+    """
+    # Entries younger than the settle window may still have lower-ID neighbours in flight,
+    # so reading stops at the first one and picks it up once it has settled
+    settle_seconds = getattr(settings, 'CASE_CHANGES_SETTLE_SECONDS', 2)
+    cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+    latest_id = _state['latest_id']
+    if latest_id is None:
+        latest_id = CaseChange.objects.filter(
+            changed_at__lte=cutoff
+        ).order_by('-id').values_list('id', flat=True).first() or 0
+        with _changed:
+            _state.update(latest_id=latest_id, floor=latest_id, buffer=[])
+            _changed.notify_all()
+        return
+
+    while True:
+        rows = CaseChange.objects.filter(id__gt=latest_id).order_by('id').values_list(
+            *Change._fields, 'changed_at'
+        )[:EVENTS_PAGE_SIZE]
+        settled = []
+        for *fields, changed_at in rows:
+            if changed_at > cutoff:
+                break
+            settled.append(Change(*fields))
+        if settled:
+            latest_id = settled[-1].id
+            with _changed:
+                buffer = _state['buffer']
+                buffer.extend(settled)
+                if len(buffer) > EVENTS_BUFFER_SIZE:
+                    dropped = len(buffer) - EVENTS_BUFFER_SIZE
+                    _state['floor'] = buffer[dropped - 1].id
+                    del buffer[:dropped]
+                _state['latest_id'] = latest_id
+                _changed.notify_all()
+        if len(settled) < EVENTS_PAGE_SIZE:
+            return
+
+def _poll_forever():
+    """
+    Poll the change log once per EVENTS_POLL_INTERVAL, so the database sees one query
+    per process however many streams are open
+    """
+    while True:
+        try:
+            poll_changes()
+        except Exception as e:
+            logger.error(f'Event poller failed to read the change log: {e}')
+            connection.close()
+        time.sleep(getattr(settings, 'EVENTS_POLL_INTERVAL', 1))
+
+def wait_for_change(seen_id, timeout):
+    """
+    Block until the poller has read past seen_id or the timeout passes
+    """
+    with _changed:
+        if _state['poller'] is None:
+            _state['poller'] = threading.Thread(target=_poll_forever, name='case-events-poller', daemon=True)
+            _state['poller'].start()
+        _changed.wait_for(lambda: _state['latest_id'] is not None and _state['latest_id'] > seen_id, timeout)
+
+def _buffered_changes(since):
+    """
+    The newest ID the poller has read and the buffered entries after since;
+    the entries are None while since is older than the buffer
+    """
+    with _changed:
+        latest_id, buffer = _state['latest_id'], _state['buffer']
+        if latest_id is None or since < _state['floor']:
+            return latest_id, None
+        start = len(buffer)
+        while start and buffer[start - 1].id > since:
+            start -= 1
+        return latest_id, buffer[start:]
+
+def format_event(entry_id, event, data):
+    return f'id: {entry_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n'
+
+def iter_events(scope, since, stream_timeout=None, heartbeat_seconds=None):
+    """
+    Server-Sent Events for the change log entries matching scope (e.g. {'company_id': 1}) after since,
+    held open until the stream times out
+    """
+    if stream_timeout is None:
+        stream_timeout = getattr(settings, 'EVENTS_STREAM_TIMEOUT', 300)
+    if heartbeat_seconds is None:
+        heartbeat_seconds = getattr(settings, 'EVENTS_HEARTBEAT_SECONDS', 15)
+    last_sent = time.monotonic()
+    deadline = last_sent + stream_timeout
+
+    yield f'retry: {EVENTS_RETRY_MS}\n\n'
+    while True:
+        latest_id, changes = _buffered_changes(since)
+        caught_up = True
+        if latest_id is not None and changes is None:
+            # Further behind than the buffer reaches, e.g. reconnecting after a while
+            changes = [Change(*row) for row in CaseChange.objects.filter(
+                id__gt=since, id__lte=latest_id, **scope
+            ).order_by('id').values_list(*Change._fields)[:EVENTS_PAGE_SIZE]]
+            caught_up = len(changes) < EVENTS_PAGE_SIZE
+        for change in changes or ():
+            since = change.id
+            if any(getattr(change, field) != value for field, value in scope.items()):
+                continue
+            yield format_event(change.id, change.event, {
+                'case_id': change.case_id,
+                'object_type': change.object_type,
+                'object_id': change.object_id,
+                'action': change.action,
+            })
+            last_sent = time.monotonic()
+        if not caught_up:
+            continue
+        if latest_id is not None:
+            since = max(since, latest_id)
+
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        # Streams are idle most of the time and must not pin a database connection while waiting
+        if not connection.in_atomic_block:
+            connection.close()
+
+        wait_for_change(since, min(deadline - now, max(last_sent + heartbeat_seconds - now, 0)))
+        if time.monotonic() - last_sent >= heartbeat_seconds:
+            yield ': heartbeat\n\n'
+            last_sent = time.monotonic()
+
+class EventStream:
+    """
+    Streaming response body holding one of the process's stream slots until the server closes it
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    def __iter__(self):
+        return self.events
+
+    def close(self):
+        with _changed:
+            if self.closed:
+                return
+            self.closed = True
+            _state['streams'] -= 1
+        self.events.close()
+
+def open_stream(scope, since):
+    """
+    The event stream for scope, or None when this process already serves EVENTS_MAX_STREAMS streams
+    """
+    with _changed:
+        if _state['streams'] >= getattr(settings, 'EVENTS_MAX_STREAMS', 12):
+            return None
+        _state['streams'] += 1
+    return EventStream(iter_events(scope, since))
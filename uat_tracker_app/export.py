@@ -0,0 +1,114 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from .lookups import get_lookup
+from .models import Note
+import csv
+import json
+
+EXPORT_CHUNK_SIZE = 2000
+
+LOOKUP_FIELDS = ('priority', 'status', 'environment', 'case_type')
+# Export column -> values() path it is read from, where they differ; lookups are mapped to their values in Python
+COLUMN_PATHS = {
+    'priority': 'priority_id',
+    'status': 'status_id',
+    'environment': 'environment_id',
+    'case_type': 'case_type_id',
+    'requestor': 'requestor__username',
+    'assigned_to': 'assigned_to__username',
+    'company': 'company__name',
+}
+CSV_COLUMNS = [
+    'id', 'case_number', 'subject', 'description', 'reproduction_steps', 'expected_result', 'actual_result',
+    'priority', 'status', 'environment', 'case_type', 'requestor', 'assigned_to', 'company',
+    'creatio_id', 'sync_status', 'created_at', 'updated_at', 'due_date', 'resolved_at',
+    'notes_count', 'attachments_count', 'last_activity_at', 'notes',
+]
+
+def parse_export_columns(fields):
+    """
+    Export columns named in a comma-separated list, in export order; every column when empty
+    """
+    if not fields:
+        return CSV_COLUMNS
+    requested = {field.strip() for field in fields.split(',') if field.strip()}
+    unknown = requested.difference(CSV_COLUMNS)
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(sorted(unknown))}')
+    return [column for column in CSV_COLUMNS if column in requested]
+
+def _export_chunk(rows, columns):
+    """
+    Finish a chunk of case rows: map lookups and attach notes with one query per chunk
+    """
+    notes = {}
+    if 'notes' in columns:
+        for note in Note.objects.filter(case_id__in=[row['id'] for row in rows]).order_by(
+            'case_id', 'created_at', 'id'
+        ).values('case_id', 'author__username', 'content', 'created_at').iterator():
+            notes.setdefault(note['case_id'], []).append({
+                'author': note['author__username'],
+                'content': note['content'],
+                'created_at': note['created_at'],
+            })
+
+    for row in rows:
+        for column in columns:
+            if column in LOOKUP_FIELDS:
+                row[column] = get_lookup(column, row.pop(COLUMN_PATHS[column])).value
+            elif column in COLUMN_PATHS:
+                row[column] = row.pop(COLUMN_PATHS[column])
+            elif column == 'notes':
+                row['notes'] = notes.get(row['id'], [])
+        yield {column: row[column] for column in columns}
+
+def iter_export_rows(cases, chunk_size=EXPORT_CHUNK_SIZE, columns=CSV_COLUMNS):
+    """
+    Yield every case as a plain dict of the given columns, streaming from the database chunk by chunk;
+    columns that are not exported are never read
+    """
+    paths = {'id'} | {COLUMN_PATHS.get(column, column) for column in columns if column != 'notes'}
+
+    chunk = []
+    for row in cases.order_by('id').values(*paths).iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield from _export_chunk(chunk, columns)
+            chunk = []
+    if chunk:
+        yield from _export_chunk(chunk, columns)
+
+class _Echo:
+    """
+    File-like object handing each written CSV line straight back to the caller
+    """
+    def write(self, value):
+        return value
+
+def stream_csv(rows, columns=CSV_COLUMNS):
+    """
+    CSV lines, header first; notes are folded into one "[time] author: content" cell
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        if 'notes' in row:
+            row['notes'] = '\n'.join(
+                f"[{note['created_at'].isoformat()}] {note['author']}: {note['content']}" for note in row['notes']
+            )
+        yield writer.writerow([
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in (row.get(column) for column in columns)
+        ])
+
+def stream_jsonl(rows, columns=None):
+    """
+    One JSON document per line
+    """
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+# format -> (line generator, content type)
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson'),
+}
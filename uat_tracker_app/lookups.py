@@ -0,0 +1,163 @@
+from collections import namedtuple
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Priority, Status, Environment, CaseType
+import json
+import threading
+import time
+import uuid
+
+# UATCase foreign key -> (key in the /api/lookups/ response, lookup model)
+LOOKUP_MODELS = (
+    ('priority', 'priorities', Priority),
+    ('status', 'statuses', Status),
+    ('environment', 'environments', Environment),
+    ('case_type', 'caseTypes', CaseType),
+)
+VERSION_KEY = 'lookups-version'
+
+LookupEntry = namedtuple('LookupEntry', ['id', 'name', 'value', 'color', 'order', 'is_active'])
+
+# Version known to this process, with the registry and payload built for it
+_state = {'version': None, 'checked_at': 0.0, 'registry': None, 'payload': None}
+_state_lock = threading.Lock()
+
+class LookupRegistry:
+    """
+    Interned rows of every lookup table for one version, resolvable by value or by ID
+    """
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.by_id = {field: {entry.id: entry for entry in entries} for field, entries in rows.items()}
+        self.by_value = {field: {entry.value: entry for entry in entries} for field, entries in rows.items()}
+        self.rows = rows
+
+    @classmethod
+    def load(cls, version):
+        return cls(version, {
+            field: [
+                LookupEntry(*row) for row in
+                model.objects.values_list('id', 'name', 'value', 'color', 'order', 'is_active')
+            ]
+            for field, _, model in LOOKUP_MODELS
+        })
+
+    def get(self, field, lookup_id):
+        return self.by_id[field].get(lookup_id)
+
+    def get_by_value(self, field, value):
+        return self.by_value[field].get(value)
+
+    def active(self, field):
+        return [entry for entry in self.rows[field] if entry.is_active]
+
+def _version_cache():
+    """
+    Cache holding the version stamp shared by every process
+    """
+    return caches[getattr(settings, 'LOOKUPS_VERSION_CACHE', 'shared')]
+
+def _set_version(version):
+    """
+    Record the version in this process, dropping what was built for an older one
+    """
+    with _state_lock:
+        if version != _state['version']:
+            _state.update(registry=None, payload=None)
+        _state.update(version=version, checked_at=time.monotonic())
+
+def bump_lookup_version():
+    """
+    Give the lookup tables a new version, invalidating cached registries, payloads and client ETags
+    """
+    version = uuid.uuid4().hex
+    _version_cache().set(VERSION_KEY, version, None)
+    _set_version(version)
+    return version
+
+def get_lookup_version(recheck=False):
+    """
+    Current lookup version; the shared stamp is re-read at most every LOOKUPS_VERSION_CHECK_INTERVAL seconds
+    """
+    with _state_lock:
+        interval = getattr(settings, 'LOOKUPS_VERSION_CHECK_INTERVAL', 5)
+        if not recheck and _state['version'] is not None and time.monotonic() - _state['checked_at'] < interval:
+            return _state['version']
+
+    cache = _version_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+
+    _set_version(version)
+    return version
+
+def get_lookup_registry(recheck=False):
+    """
+    Registry for the current lookup version, loaded once per process and version
+    """
+    version = get_lookup_version(recheck)
+    with _state_lock:
+        registry = _state['registry']
+        if registry is not None and registry.version == version:
+            return registry
+
+    registry = LookupRegistry.load(version)
+    with _state_lock:
+        if _state['version'] == version:
+            _state['registry'] = registry
+    return registry
+
+def resolve_lookup_id(field, value):
+    """
+    ID of the lookup row with this value, or None; a miss re-checks the shared version once
+    """
+    entry = get_lookup_registry().get_by_value(field, value)
+    if entry is None:
+        entry = get_lookup_registry(recheck=True).get_by_value(field, value)
+    return entry.id if entry else None
+
+def get_lookup(field, lookup_id):
+    """
+    Interned lookup entry for an ID; a miss re-checks the shared version once
+    """
+    entry = get_lookup_registry().get(field, lookup_id)
+    if entry is None:
+        entry = get_lookup_registry(recheck=True).get(field, lookup_id)
+    return entry
+
+def get_lookup_etag(version):
+    return f'"lookups-{version}"'
+
+def serialize_lookups(registry):
+    """
+    Active rows of every lookup table, as returned by /api/lookups/
+    """
+    return {
+        key: [
+            {'id': entry.id, 'name': entry.name, 'value': entry.value, 'color': entry.color}
+            for entry in registry.active(field)
+        ]
+        for field, key, _ in LOOKUP_MODELS
+    }
+
+def get_lookups_payload(registry):
+    """
+    Serialized /api/lookups/ response body for the registry's version, built once per process
+    """
+    with _state_lock:
+        if _state['version'] == registry.version and _state['payload'] is not None:
+            return _state['payload']
+
+    payload = json.dumps(
+        {'success': True, 'lookups': serialize_lookups(registry), 'version': registry.version},
+        cls=DjangoJSONEncoder
+    ).encode()
+
+    with _state_lock:
+        if _state['version'] == registry.version:
+            _state['payload'] = payload
+    return payload
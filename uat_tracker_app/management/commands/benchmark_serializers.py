@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from uat_tracker_app.lookups import LOOKUP_MODELS, get_lookup_registry
+from uat_tracker_app.serializers import CASE_SERIALIZER, RECENT_ACTIVITY_SERIALIZER, orjson
+import json
+import time
+
+class Command(BaseCommand):
+    help = 'Measure how many case rows per second the shared serializers build and encode'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Synthetic case rows per run',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per measurement; the fastest one is reported',
+        )
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError('--rows and --repeat must be at least 1')
+
+        registry = get_lookup_registry()
+        lookups = {field: registry.rows[field] for field, _, _ in LOOKUP_MODELS}
+        empty = [field for field, entries in lookups.items() if not entries]
+        if empty:
+            raise CommandError(f'No lookup rows to build cases from: {", ".join(empty)}')
+
+        rows = [self.build_row(i, lookups) for i in range(options['rows'])]
+        encoders = [('json', lambda data: json.dumps(data, cls=DjangoJSONEncoder))]
+        if orjson is not None:
+            encoders.append(('orjson', lambda data: orjson.dumps(data, default=DjangoJSONEncoder().default)))
+
+        for name, serializer in (('case rows', CASE_SERIALIZER), ('recent activity', RECENT_ACTIVITY_SERIALIZER)):
+            elapsed = self.measure(lambda: serializer.serialize(rows), options['repeat'])
+            self.report(f'{name}: serialize', len(rows), elapsed)
+
+            data = serializer.serialize(rows)
+            for encoder_name, encode in encoders:
+                elapsed = self.measure(lambda: encode(data), options['repeat'])
+                self.report(f'{name}: encode with {encoder_name}', len(rows), elapsed)
+
+    def build_row(self, i, lookups):
+        """
+        A values() row carrying every path the serializers read
+        """
+        now = timezone.now()
+        row = {path: f'{path} {i}' for path in CASE_SERIALIZER.paths() | RECENT_ACTIVITY_SERIALIZER.paths()}
+        for field, entries in lookups.items():
+            row[f'{field}_id'] = entries[i % len(entries)].id
+        row.update(
+            id=i, requestor_id=1, assigned_to_id=None if i % 2 else 2,
+            notes_count=i % 7, attachments_count=i % 3,
+            created_at=now, updated_at=now, last_activity_at=now if i % 2 else None,
+        )
+        return row
+
+    def measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def report(self, name, count, elapsed):
+        self.stdout.write(self.style.SUCCESS(f'✓ {name}: {count / elapsed:,.0f} rows/s'))
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from uat_tracker_app.models import UATCase, Note, Attachment, CaseChange
+import re
+
+# Plan lines that mean a whole table is read row by row
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (\w+)$'),
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+}
+
+def get_hot_queries():
+    """
+    The query shapes the app runs on every request or sync round
+    """
+    # EXPLAIN only needs the shape of the query, so placeholder IDs are enough
+    return [
+        ('cases by requestor', UATCase.objects.filter(requestor_id=1).order_by('-created_at', '-id')[:50]),
+        ('recent activity by requestor', UATCase.objects.filter(requestor_id=1).order_by('-updated_at')[:10]),
+        ('recent activity by company', UATCase.objects.filter(company_id=1).order_by('-updated_at')[:10]),
+        ('cases by company and status', UATCase.objects.filter(company_id=1, status_id=1)),
+        ('cases by company and priority', UATCase.objects.filter(company_id=1, priority_id=1)),
+        ('pending sync', UATCase.objects.filter(sync_status='pending')),
+        ('last synced case', UATCase.objects.filter(last_synced__isnull=False).order_by('-last_synced')[:1]),
+        ('cases by Creatio ID', UATCase.objects.filter(creatio_id__in=['00000000-0000-0000-0000-000000000000'])),
+        ('case notes', Note.objects.filter(case_id=1).order_by('-created_at')),
+        ('case attachments', Attachment.objects.filter(case_id=1).order_by('-uploaded_at')),
+        ('changes feed by company', CaseChange.objects.filter(company_id=1, id__gt=0).order_by('id')[:500]),
+        ('changes feed by requestor', CaseChange.objects.filter(requestor_id=1, id__gt=0).order_by('id')[:500]),
+    ]
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the hot queries and fail if any of them does a full table scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full plan of every query',
+        )
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'EXPLAIN checks are not supported on {connection.vendor}')
+
+        full_scans = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small tables are cheaper to scan, so make the planner prefer any usable index
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset in get_hot_queries():
+                plan = queryset.explain()
+                scanned = [
+                    match.group(1) for match in (pattern.search(line.strip()) for line in plan.splitlines())
+                    if match
+                ]
+
+                if scanned:
+                    full_scans.append(name)
+                    self.stdout.write(self.style.ERROR(f'✗ {name}: full scan of {", ".join(scanned)}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'✓ {name}'))
+
+                if options['verbose_plans'] or scanned:
+                    self.stdout.write(plan)
+
+        if full_scans:
+            raise CommandError(f'{len(full_scans)} hot queries fall back to a full table scan')
+        self.stdout.write(self.style.SUCCESS(f'✓ All hot queries use an index ({connection.vendor})'))
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from uat_tracker_app.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_export_rows, parse_export_columns
+from uat_tracker_app.models import UATCase
+
+class Command(BaseCommand):
+    help = 'Stream cases with their notes to CSV or JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=sorted(EXPORT_FORMATS),
+            default='csv',
+            help='Output format',
+        )
+        parser.add_argument(
+            '--company',
+            type=int,
+            help='Only export cases of this company ID',
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to (defaults to stdout)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Cases fetched from the database at a time',
+        )
+        parser.add_argument(
+            '--fields',
+            help='Comma-separated columns to export (defaults to all of them)',
+        )
+        parser.add_argument(
+            '--without-notes',
+            action='store_true',
+            help='Skip the notes of each case',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        try:
+            columns = parse_export_columns(options['fields'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if options['without_notes']:
+            columns = [column for column in columns if column != 'notes']
+
+        cases = UATCase.objects.all()
+        if options['company']:
+            cases = cases.filter(company_id=options['company'])
+
+        stream, _ = EXPORT_FORMATS[options['format']]
+        rows = iter_export_rows(cases, options['chunk_size'], columns)
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                for line in stream(self.count(rows), columns):
+                    output.write(line)
+            self.stdout.write(
+                self.style.SUCCESS(f'✓ Exported {self.exported} cases to {options["output"]}')
+            )
+        else:
+            for line in stream(self.count(rows), columns):
+                self.stdout.write(line, ending='')
+            self.stderr.write(self.style.SUCCESS(f'✓ Exported {self.exported} cases'))
+
+    def count(self, rows):
+        """Pass rows through, counting them for the summary"""
+        self.exported = 0
+        for row in rows:
+            self.exported += 1
+            yield row
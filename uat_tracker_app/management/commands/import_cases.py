@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from uat_tracker_app.case_import import IMPORT_CHUNK_SIZE, IMPORT_FORMATS, CaseImporter, parse_import_rows
+from uat_tracker_app.models import Company
+import os
+import sys
+import time
+
+class Command(BaseCommand):
+    help = 'Bulk import cases from a CSV or JSONL file and queue them for Creatio sync'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='CSV or JSONL file to import ("-" reads stdin)',
+        )
+        parser.add_argument(
+            '--company',
+            type=int,
+            required=True,
+            help='Company ID the cases belong to',
+        )
+        parser.add_argument(
+            '--requestor',
+            required=True,
+            help='Username used when a row has no requestor column',
+        )
+        parser.add_argument(
+            '--format',
+            choices=IMPORT_FORMATS,
+            help='Input format (defaults to the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help='Rows inserted per bulk_create',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row without inserting anything',
+        )
+        parser.add_argument(
+            '--no-sync',
+            action='store_true',
+            help='Do not queue the imported cases for Creatio (leave them pending for sync_creatio)',
+        )
+
+    def handle(self, *args, **options):
+        import_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError('Cannot tell the format from the file name, pass --format')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        try:
+            company = Company.objects.get(id=options['company'])
+            requestor = User.objects.get(username=options['requestor'])
+        except (Company.DoesNotExist, User.DoesNotExist) as e:
+            raise CommandError(str(e))
+
+        importer = CaseImporter(
+            company, requestor, options['chunk_size'],
+            queue_sync=not options['no_sync'], dry_run=options['dry_run']
+        )
+
+        started = time.monotonic()
+        if options['path'] == '-':
+            importer.run(parse_import_rows(sys.stdin, import_format))
+        else:
+            with open(options['path'], newline='', encoding='utf-8-sig') as lines:
+                importer.run(parse_import_rows(lines, import_format))
+        elapsed = time.monotonic() - started
+
+        for line_number, error in importer.errors:
+            self.stdout.write(self.style.ERROR(f'✗ Line {line_number}: {error}'))
+
+        rate = importer.imported / elapsed if elapsed else 0
+        action = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✓ {action} {importer.imported} cases in {elapsed:.1f}s ({rate:.0f} rows/s), '
+                f'{len(importer.errors)} rows rejected'
+            )
+        )
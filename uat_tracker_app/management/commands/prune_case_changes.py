@@ -0,0 +1,25 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from uat_tracker_app.models import CaseChange
+
+class Command(BaseCommand):
+    help = 'Delete old entries of the case changes feed (clients with older tokens reload their lists)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Keep entries from the last N days',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = CaseChange.objects.filter(changed_at__lt=cutoff).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Pruned {deleted} case change entries older than {options["days"]} days')
+        )
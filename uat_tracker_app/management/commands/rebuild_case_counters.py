@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from uat_tracker_app.models import UATCase
+
+class Command(BaseCommand):
+    help = 'Verify and rebuild the denormalized notes/attachments counters and last activity of cases'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=int,
+            help='Only check cases of this company ID',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without rewriting the counters',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Cases rewritten per UPDATE',
+        )
+
+    def handle(self, *args, **options):
+        cases = UATCase.objects.all()
+        if options['company']:
+            cases = cases.filter(company_id=options['company'])
+
+        expressions = UATCase.counter_expressions()
+        expected_names = {field: f'expected_{field}' for field in UATCase.COUNTER_FIELDS}
+
+        with transaction.atomic():
+            rows = cases.annotate(
+                **{expected_names[field]: expression for field, expression in expressions.items()}
+            ).values('id', 'case_number', *UATCase.COUNTER_FIELDS, *expected_names.values()).order_by('id')
+
+            drifted = []
+            checked = 0
+            for row in rows.iterator():
+                checked += 1
+                changes = {
+                    field: row[expected_names[field]] for field in UATCase.COUNTER_FIELDS
+                    if row[field] != row[expected_names[field]]
+                }
+                if changes:
+                    drifted.append(row['id'])
+                    self.stdout.write(
+                        f'Case {row["case_number"]}: ' + ', '.join(
+                            f'{field} stored {row[field]}, actual {value}' for field, value in changes.items()
+                        )
+                    )
+
+            if options['dry_run']:
+                self.stdout.write(f'{len(drifted)} of {checked} cases have drifted (dry run, nothing changed)')
+                return
+
+            for start in range(0, len(drifted), options['batch_size']):
+                UATCase.objects.filter(id__in=drifted[start:start + options['batch_size']]).update(**expressions)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Checked {checked} cases, rebuilt counters of {len(drifted)}')
+        )
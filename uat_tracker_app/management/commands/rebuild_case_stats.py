@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from uat_tracker_app.models import UATCase, CaseStats
+
+BUCKET_FIELDS = ('company_id', 'status_id', 'priority_id', 'sync_status')
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized per-company case statistics from UATCase rows'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=int,
+            help='Only rebuild statistics for this company ID',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without rewriting the statistics',
+        )
+    
+    def handle(self, *args, **options):
+        cases = UATCase.objects.all()
+        stats = CaseStats.objects.all()
+        if options['company']:
+            cases = cases.filter(company_id=options['company'])
+            stats = stats.filter(company_id=options['company'])
+        
+        with transaction.atomic():
+            expected = {
+                tuple(row[field] for field in BUCKET_FIELDS): row['count']
+                for row in cases.values(*BUCKET_FIELDS).annotate(count=Count('id')).order_by()
+            }
+            current = {
+                tuple(row[field] for field in BUCKET_FIELDS): row['count']
+                for row in stats.select_for_update().values(*BUCKET_FIELDS, 'count')
+            }
+            
+            drifted = [
+                bucket for bucket in expected.keys() | current.keys()
+                if expected.get(bucket, 0) != current.get(bucket, 0)
+            ]
+            for bucket in drifted:
+                self.stdout.write(
+                    f'Bucket {bucket}: stored {current.get(bucket, 0)}, actual {expected.get(bucket, 0)}'
+                )
+            
+            if options['dry_run']:
+                self.stdout.write(f'{len(drifted)} drifted buckets found (dry run, nothing changed)')
+                return
+            
+            stats.delete()
+            CaseStats.objects.bulk_create([
+                CaseStats(**dict(zip(BUCKET_FIELDS, bucket)), count=count)
+                for bucket, count in expected.items()
+            ])
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Rebuilt {len(expected)} case statistics buckets ({len(drifted)} had drifted)')
+        )
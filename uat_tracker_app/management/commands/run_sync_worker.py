@@ -0,0 +1,205 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from uat_tracker_app.models import Note, SyncOutbox
+from uat_tracker_app.creatio_service import CreatioService
+from uat_tracker_app.lookups import get_lookup
+from uat_tracker_app.sync_engine import SyncEngine
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed entry is reserved for this worker before others may retry it
+LEASE = timedelta(minutes=5)
+
+class Command(BaseCommand):
+    help = 'Drain the Creatio sync outbox in the background'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no entries are due instead of polling',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Outbox entries claimed per round',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to sleep when the outbox is empty',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=8,
+            help='Attempts before an entry is marked failed',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Cases synced in parallel (entries of one case always run in order)',
+        )
+
+    def handle(self, *args, **options):
+        self.max_attempts = options['max_attempts']
+        self.services = {}
+        engine = SyncEngine(options['concurrency']) if options['concurrency'] > 1 else None
+
+        self.stdout.write('Sync worker started')
+        try:
+            while True:
+                entries = self.claim_entries(options['batch_size'])
+                if not entries:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                # Group by case, keeping queue order within each case
+                by_case = {}
+                for entry in entries:
+                    by_case.setdefault(entry.case_id, []).append(entry)
+
+                for case_id, case_entries in by_case.items():
+                    if engine:
+                        engine.submit(case_id, self.process_case_entries, case_entries)
+                    else:
+                        self.process_case_entries(case_entries)
+                if engine:
+                    engine.wait()
+        except KeyboardInterrupt:
+            self.stdout.write('Sync worker stopped')
+        finally:
+            if engine:
+                engine.shutdown()
+
+    def claim_entries(self, batch_size):
+        """Claim due outbox entries, leasing them so other workers skip them; an entry waits while an earlier entry of its case is unfinished"""
+        now = timezone.now()
+        unfinished = SyncOutbox.objects.filter(status__in=['pending', 'processing'])
+        with transaction.atomic():
+            entries = list(
+                SyncOutbox.objects.select_for_update(skip_locked=True, of=('self',)).filter(
+                    status__in=['pending', 'processing'],
+                    available_at__lte=now
+                ).exclude(
+                    # An earlier entry of the case is leased by a worker or backing off
+                    Exists(unfinished.filter(case_id=OuterRef('case_id'), id__lt=OuterRef('id'), available_at__gt=now))
+                ).select_related(
+                    'case__company', 'case__requestor', 'note__author'
+                ).order_by('id')[:batch_size]
+            )
+            
+            # Earlier entries left out of this claim (locked by another worker or past the batch) hold back the rest
+            blockers = {}
+            for case_id, entry_id in unfinished.filter(
+                case_id__in={entry.case_id for entry in entries}
+            ).exclude(id__in=[entry.id for entry in entries]).values_list('case_id', 'id'):
+                blockers[case_id] = min(entry_id, blockers.get(case_id, entry_id))
+            entries = [entry for entry in entries if entry.id < blockers.get(entry.case_id, entry.id + 1)]
+            
+            SyncOutbox.objects.filter(id__in=[entry.id for entry in entries]).update(
+                status='processing',
+                available_at=now + LEASE
+            )
+        return entries
+
+    def get_service(self, company):
+        """One CreatioService per company for the lifetime of the worker"""
+        if company.id not in self.services:
+            self.services[company.id] = CreatioService(company)
+        return self.services[company.id]
+
+    def process_case_entries(self, entries):
+        """Run one case's entries in order, stopping at the first failure"""
+        case = entries[0].case
+        case.refresh_from_db()
+        creatio_service = self.get_service(case.company)
+        pushed = False
+
+        for index, entry in enumerate(entries):
+            try:
+                if entry.operation in ('create_case', 'update_case'):
+                    # Every push sends the current case, so repeated pushes coalesce
+                    if not pushed:
+                        self.push_case(creatio_service, case)
+                        pushed = True
+                else:
+                    self.push_comment(creatio_service, case, entry.note)
+            except Exception as e:
+                self.record_failure(case, entry, entries[index + 1:], e)
+                return
+            entry.delete()
+
+    def push_case(self, creatio_service, case):
+        """Create or update the case in Creatio"""
+        case_data = {
+            'subject': case.subject,
+            'description': case.description,
+            'priority': get_lookup('priority', case.priority_id).name,
+            'status': get_lookup('status', case.status_id).name,
+            'case_type': get_lookup('case_type', case.case_type_id).name,
+            'reproduction_steps': case.reproduction_steps,
+            'created_at': case.created_at.isoformat(),
+        }
+
+        if case.creatio_id:
+            creatio_service.update_case(case.creatio_id, case_data)
+            self.stdout.write(f'Updated case {case.id} in Creatio')
+        else:
+            result = creatio_service.create_case(case_data)
+            case.creatio_id = result.get('Id')
+            Note.objects.create(
+                case=case,
+                author=case.requestor,
+                content=f'Case synchronized with Creatio. Case ID: {case.creatio_id}'
+            )
+            self.stdout.write(f'Created case {case.id} in Creatio with ID {case.creatio_id}')
+
+        case.save_sync_state(
+            creatio_id=case.creatio_id, sync_status='synced', sync_error=None, last_synced=timezone.now()
+        )
+
+    def push_comment(self, creatio_service, case, note):
+        """Add a note to the Creatio case as a comment"""
+        if not case.creatio_id:
+            raise Exception('Case has not been created in Creatio yet')
+
+        creatio_service.add_case_comment(case.creatio_id, {
+            'content': note.content,
+            'author': note.author.username,
+            'created_at': note.created_at.isoformat(),
+        })
+        self.stdout.write(f'Synced note {note.id} for case {case.id} with Creatio')
+
+    def record_failure(self, case, entry, later_entries, error):
+        """Schedule a retry with exponential backoff, or give up after max attempts"""
+        logger.error(f'Failed to sync {entry.operation} for case {case.id}: {error}')
+        self.stdout.write(
+            self.style.ERROR(f'✗ Failed to sync {entry.operation} for case {case.id}: {error}')
+        )
+
+        entry.attempts += 1
+        entry.last_error = str(error)
+        if entry.attempts >= self.max_attempts:
+            entry.status = 'failed'
+            case.save_sync_state(sync_status='failed', sync_error=str(error))
+        else:
+            entry.status = 'pending'
+            entry.available_at = timezone.now() + timedelta(seconds=min(30 * 2 ** (entry.attempts - 1), 3600))
+        entry.save()
+
+        # Later entries of the case wait for this one so they are never applied out of order
+        SyncOutbox.objects.filter(id__in=[later.id for later in later_entries]).update(
+            status='pending',
+            available_at=entry.available_at
+        )
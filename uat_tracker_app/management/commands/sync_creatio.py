@@ -1,7 +1,11 @@
+from collections import Counter
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
-from uat_tracker_app.models import UATCase, Note
-from uat_tracker_app.creatio_service import CreatioService
+from uat_tracker_app.models import UATCase, Note, CaseStats, CaseChange
+from uat_tracker_app.creatio_service import CreatioService, get_transport_metrics
+from uat_tracker_app.lookups import get_lookup, get_lookup_registry
+from uat_tracker_app.sync_engine import SyncEngine
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,20 +24,52 @@ class Command(BaseCommand):
             action='store_true',
             help='Test connection to Creatio',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1,
+            help='Push pending cases to Creatio in BatchQuery requests of this many cases',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Run up to this many Creatio operations in parallel (per-case order is kept)',
+        )
     
     def handle(self, *args, **options):
         creatio_service = CreatioService()
+        self.batch_size = max(options['batch_size'], 1)
+        self.engine = SyncEngine(options['concurrency']) if options['concurrency'] > 1 else None
         
         if options['test_connection']:
             self.test_connection(creatio_service)
             return
         
-        if options['full_sync']:
-            self.stdout.write('Performing full sync with Creatio...')
-            self.full_sync(creatio_service)
+        try:
+            if options['full_sync']:
+                self.stdout.write('Performing full sync with Creatio...')
+                self.full_sync(creatio_service)
+            else:
+                self.stdout.write('Performing incremental sync with Creatio...')
+                self.incremental_sync(creatio_service)
+        finally:
+            if self.engine:
+                self.engine.shutdown()
+        
+        self.report_transport_metrics()
+    
+    def run(self, key, operation, *args):
+        """Run an operation now, or queue it on the sync engine behind earlier work for the same key"""
+        if self.engine:
+            self.engine.submit(key, operation, *args)
         else:
-            self.stdout.write('Performing incremental sync with Creatio...')
-            self.incremental_sync(creatio_service)
+            operation(*args)
+    
+    def wait(self):
+        """Wait for all queued operations to finish"""
+        if self.engine:
+            self.engine.wait()
     
     def test_connection(self, creatio_service):
         """Test connection to Creatio"""
@@ -52,14 +88,23 @@ class Command(BaseCommand):
                 self.style.ERROR(f'✗ Connection test error: {e}')
             )
     
+    def report_transport_metrics(self):
+        """Report how many Creatio requests reused a pooled connection"""
+        for key, metrics in get_transport_metrics().items():
+            self.stdout.write(
+                f"HTTP transport ({key}): {metrics['requests']} requests, "
+                f"{metrics['connections_opened']} connections opened, "
+                f"{metrics['connections_reused']} reused"
+            )
+    
     def full_sync(self, creatio_service):
         """Perform full sync of all cases"""
         try:
             # Sync all pending cases to Creatio
-            pending_cases = UATCase.objects.filter(sync_status='pending')
-            
-            for case in pending_cases:
-                self.sync_case_to_creatio(creatio_service, case)
+            pending_cases = UATCase.objects.filter(sync_status='pending').exclude(
+                outbox_entries__status__in=['pending', 'processing']  # run_sync_worker owns these
+            )
+            self.push_pending_cases(creatio_service, pending_cases)
             
             # Pull updates from Creatio
             self.pull_updates_from_creatio(creatio_service)
@@ -77,10 +122,10 @@ class Command(BaseCommand):
         """Perform incremental sync based on last sync time"""
         try:
             # Sync pending cases to Creatio
-            pending_cases = UATCase.objects.filter(sync_status='pending')
-            
-            for case in pending_cases:
-                self.sync_case_to_creatio(creatio_service, case)
+            pending_cases = UATCase.objects.filter(sync_status='pending').exclude(
+                outbox_entries__status__in=['pending', 'processing']  # run_sync_worker owns these
+            )
+            self.push_pending_cases(creatio_service, pending_cases)
             
             # Pull recent updates from Creatio
             # Get the most recent sync time
@@ -103,18 +148,75 @@ class Command(BaseCommand):
                 self.style.ERROR(f'✗ Incremental sync failed: {e}')
             )
     
+    def build_case_data(self, case):
+        """Map a local case to the data CreatioService pushes"""
+        return {
+            'subject': case.subject,
+            'description': case.description,
+            'priority': get_lookup('priority', case.priority_id).name,
+            'status': get_lookup('status', case.status_id).name,
+            'case_type': get_lookup('case_type', case.case_type_id).name,
+            'reproduction_steps': case.reproduction_steps,
+            'created_at': case.created_at.isoformat(),
+        }
+    
+    def push_pending_cases(self, creatio_service, pending_cases):
+        """Push pending cases one by one, or in batches when --batch-size is above 1"""
+        if self.batch_size == 1:
+            for case in pending_cases.select_related('requestor'):
+                self.run(case.id, self.sync_case_to_creatio, creatio_service, case)
+        else:
+            case_ids = list(pending_cases.values_list('id', flat=True))
+            for start in range(0, len(case_ids), self.batch_size):
+                cases = UATCase.objects.filter(
+                    id__in=case_ids[start:start + self.batch_size]
+                ).select_related('requestor')
+                self.run(('batch', start), self.sync_batch_to_creatio, creatio_service, list(cases))
+        
+        # Pushes finish before any pulled update is applied to the same cases
+        self.wait()
+    
+    def sync_batch_to_creatio(self, creatio_service, cases):
+        """Sync a batch of cases to Creatio with one BatchQuery request"""
+        try:
+            results = creatio_service.push_cases_batch(
+                [(case.creatio_id, self.build_case_data(case)) for case in cases]
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'✗ Failed to sync batch of {len(cases)} cases: {e}')
+            )
+            logger.error(f'Failed to sync batch of {len(cases)} cases: {e}')
+            return
+        
+        synced_count = 0
+        for case, result in zip(cases, results):
+            if not result['success']:
+                # Only this case stays pending, the rest of the batch is applied
+                self.stdout.write(
+                    self.style.ERROR(f'✗ Failed to sync case {case.id}: {result["error"]}')
+                )
+                logger.error(f'Failed to sync case {case.id}: {result["error"]}')
+                continue
+            
+            case.save_sync_state(
+                creatio_id=result.get('Id'), sync_status='synced', sync_error=None, last_synced=timezone.now()
+            )
+            
+            # Add system note
+            Note.objects.create(
+                case=case,
+                author=case.requestor,
+                content=f'Case synchronized with Creatio. Creatio ID: {case.creatio_id}'
+            )
+            synced_count += 1
+        
+        self.stdout.write(f'Synced batch of {len(cases)} cases to Creatio ({synced_count} succeeded)')
+    
     def sync_case_to_creatio(self, creatio_service, case):
         """Sync a single case to Creatio"""
         try:
-            case_data = {
-                'subject': case.subject,
-                'description': case.description,
-                'priority': case.priority,
-                'status': case.status,
-                'case_type': case.case_type,
-                'reproduction_steps': case.reproduction_steps,
-                'created_at': case.created_at.isoformat(),
-            }
+            case_data = self.build_case_data(case)
             
             if case.creatio_id:
                 # Update existing case
@@ -126,9 +228,9 @@ class Command(BaseCommand):
                 case.creatio_id = result.get('Id')
                 self.stdout.write(f'Created case {case.id} in Creatio with ID {case.creatio_id}')
             
-            case.sync_status = 'synced'
-            case.last_synced = timezone.now()
-            case.save()
+            case.save_sync_state(
+                creatio_id=case.creatio_id, sync_status='synced', sync_error=None, last_synced=timezone.now()
+            )
             
             # Add system note
             Note.objects.create(
@@ -146,12 +248,16 @@ class Command(BaseCommand):
     def pull_updates_from_creatio(self, creatio_service, last_sync_time=None):
         """Pull updates from Creatio"""
         try:
-            creatio_cases = creatio_service.sync_cases_from_creatio(last_sync_time)
+            pulled_count = 0
+            for page in creatio_service.iter_case_pages(last_sync_time):
+                # Apply pages in order; with --concurrency the next page is fetched while
+                # this one is written, and at most one page waits to be applied
+                self.wait()
+                self.run('pull', self.apply_creatio_page, page)
+                pulled_count += len(page)
+            self.wait()
             
-            for creatio_case in creatio_cases:
-                self.update_local_case_from_creatio(creatio_case)
-            
-            self.stdout.write(f'Pulled {len(creatio_cases)} updates from Creatio')
+            self.stdout.write(f'Pulled {pulled_count} updates from Creatio')
             
         except Exception as e:
             self.stdout.write(
@@ -159,48 +265,88 @@ class Command(BaseCommand):
             )
             logger.error(f'Failed to pull updates from Creatio: {e}')
     
-    def update_local_case_from_creatio(self, creatio_case):
-        """Update local case with data from Creatio"""
+    def apply_creatio_page(self, page):
+        """Apply a page of pulled Creatio cases with one lookup query and one bulk update"""
         try:
-            creatio_id = creatio_case.get('Id')
+            # Lookup rows are resolved from the in-process registry
+            registry = get_lookup_registry()
             
-            # Find local case by Creatio ID
-            try:
-                local_case = UATCase.objects.get(creatio_id=creatio_id)
-            except UATCase.DoesNotExist:
-                self.stdout.write(f'Local case not found for Creatio ID {creatio_id}')
-                return
+            creatio_cases = {
+                creatio_case['Id']: creatio_case for creatio_case in page if creatio_case.get('Id')
+            }
+            now = timezone.now()
             
-            # Update local case with Creatio data
-            local_case.subject = creatio_case.get('Subject', local_case.subject)
-            local_case.description = creatio_case.get('Description', local_case.description)
-            local_case.status = self._map_creatio_status(creatio_case.get('Status'))
-            local_case.priority = self._map_creatio_priority(creatio_case.get('Priority'))
-            local_case.last_synced = timezone.now()
-            local_case.save()
+            with transaction.atomic():
+                local_cases = UATCase.objects.select_for_update().filter(
+                    creatio_id__in=list(creatio_cases)
+                ).only(
+                    'id', 'creatio_id', 'subject', 'description', 'company_id', 'requestor_id',
+                    'status_id', 'priority_id', 'sync_status', 'last_synced', 'updated_at'
+                )
+                
+                changed = []
+                found_ids = set()
+                stats_deltas = Counter()
+                for local_case in local_cases:
+                    creatio_case = creatio_cases[local_case.creatio_id]
+                    found_ids.add(local_case.creatio_id)
+                    
+                    subject = creatio_case.get('Subject')
+                    description = creatio_case.get('Description')
+                    status = registry.get_by_value('status', self._map_creatio_status(creatio_case.get('Status')))
+                    priority = registry.get_by_value('priority', self._map_creatio_priority(creatio_case.get('Priority')))
+                    
+                    updates = {
+                        'subject': subject if subject is not None else local_case.subject,
+                        'description': description if description is not None else local_case.description,
+                        'status_id': status.id if status else local_case.status_id,
+                        'priority_id': priority.id if priority else local_case.priority_id,
+                    }
+                    if all(getattr(local_case, field) == value for field, value in updates.items()):
+                        continue
+                    
+                    old_bucket = local_case.get_stats_bucket()
+                    for field, value in updates.items():
+                        setattr(local_case, field, value)
+                    local_case.last_synced = now
+                    # bulk_update skips auto_now
+                    local_case.updated_at = now
+                    stats_deltas[old_bucket] -= 1
+                    stats_deltas[local_case.get_stats_bucket()] += 1
+                    changed.append(local_case)
+                
+                UATCase.objects.bulk_update(
+                    changed, ['subject', 'description', 'status', 'priority', 'last_synced', 'updated_at']
+                )
+                CaseStats.apply_deltas(stats_deltas)
+                CaseChange.record([CaseChange.for_case(case, 'case', case.id) for case in changed])
             
-            self.stdout.write(f'Updated local case {local_case.id} from Creatio')
+            self.stdout.write(
+                f'Updated {len(changed)} local cases from Creatio '
+                f'({len(found_ids) - len(changed)} unchanged, '
+                f'{len(creatio_cases) - len(found_ids)} without a local case)'
+            )
             
         except Exception as e:
             self.stdout.write(
-                self.style.ERROR(f'✗ Failed to update local case: {e}')
+                self.style.ERROR(f'✗ Failed to update local cases: {e}')
             )
     
     def _map_creatio_status(self, creatio_status):
-        """Map Creatio status to local status"""
+        """Map Creatio status to local status value (None keeps the local status)"""
         status_mapping = {
             'New': 'new',
             'In Progress': 'in-progress',
             'Resolved': 'resolved',
             'Closed': 'closed'
         }
-        return status_mapping.get(creatio_status, 'new')
+        return status_mapping.get(creatio_status)
     
     def _map_creatio_priority(self, creatio_priority):
-        """Map Creatio priority to local priority"""
+        """Map Creatio priority to local priority value (None keeps the local priority)"""
         priority_mapping = {
             'Low': 'low',
             'Medium': 'medium',
             'High': 'high'
         }
-        return priority_mapping.get(creatio_priority, 'medium')
\ No newline at end of file
+        return priority_mapping.get(creatio_priority)
\ No newline at end of file
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def populate_case_stats(apps, schema_editor):
+    UATCase = apps.get_model('uat_tracker_app', 'UATCase')
+    CaseStats = apps.get_model('uat_tracker_app', 'CaseStats')
+    buckets = UATCase.objects.values(
+        'company_id', 'status_id', 'priority_id', 'sync_status'
+    ).annotate(count=Count('id')).order_by()
+    CaseStats.objects.bulk_create([CaseStats(**bucket) for bucket in buckets])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uat_tracker_app', '0003_add_dynamic_admin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sync_status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='case_stats', to='uat_tracker_app.company')),
+                ('priority', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='uat_tracker_app.priority')),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='uat_tracker_app.status')),
+            ],
+            options={
+                'verbose_name_plural': 'Case statistics',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='casestats',
+            constraint=models.UniqueConstraint(fields=('company', 'status', 'priority', 'sync_status'), name='unique_case_stats_bucket'),
+        ),
+        migrations.RunPython(populate_case_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uat_tracker_app', '0004_add_case_stats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uatcase',
+            name='creatio_id',
+            field=models.CharField(blank=True, db_index=True, max_length=50, null=True),
+        ),
+    ]
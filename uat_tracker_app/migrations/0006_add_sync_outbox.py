@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uat_tracker_app', '0005_index_creatio_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operation', models.CharField(choices=[('create_case', 'Create case'), ('update_case', 'Update case'), ('add_comment', 'Add comment')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Not processed before this time (retry backoff or worker lease)')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_entries', to='uat_tracker_app.uatcase')),
+                ('note', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='uat_tracker_app.note')),
+            ],
+            options={
+                'verbose_name_plural': 'Sync outbox',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='outbox_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:58
+
+from django.db import migrations, models
+
+
+def seed_case_number_sequences(apps, schema_editor):
+    UATCase = apps.get_model('uat_tracker_app', 'UATCase')
+    CaseNumberSequence = apps.get_model('uat_tracker_app', 'CaseNumberSequence')
+    last_values = {}
+    for case_number in UATCase.objects.values_list('case_number', flat=True).iterator():
+        parts = case_number.split('-')
+        if len(parts) == 3 and parts[1].isdigit() and parts[2].isdigit():
+            year, number = int(parts[1]), int(parts[2])
+            last_values[year] = max(last_values.get(year, 0), number)
+    CaseNumberSequence.objects.bulk_create([
+        CaseNumberSequence(year=year, last_value=last_value)
+        for year, last_value in last_values.items()
+    ])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uat_tracker_app', '0006_add_sync_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseNumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(unique=True)),
+                ('last_value', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_case_number_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uat_tracker_app', '0007_add_case_number_sequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attachment',
+            index=models.Index(fields=['case', '-uploaded_at'], name='attachment_case_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['case', '-created_at'], name='note_case_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uatcase',
+            index=models.Index(fields=['requestor', '-created_at', '-id'], name='case_requestor_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uatcase',
+            index=models.Index(fields=['requestor', '-updated_at'], name='case_requestor_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uatcase',
+            index=models.Index(fields=['company', '-updated_at'], name='case_company_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uatcase',
+            index=models.Index(fields=['company', 'status'], name='case_company_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uatcase',
+            index=models.Index(fields=['company', 'priority'], name='case_company_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uatcase',
+            index=models.Index(fields=['sync_status'], name='case_sync_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uatcase',
+            index=models.Index(fields=['last_synced'], name='case_last_synced_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:00
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+def backfill_case_activity(apps, schema_editor):
+    UATCase = apps.get_model('uat_tracker_app', 'UATCase')
+    Note = apps.get_model('uat_tracker_app', 'Note')
+    Attachment = apps.get_model('uat_tracker_app', 'Attachment')
+
+    def children(model):
+        return model.objects.filter(case=OuterRef('pk')).order_by().values('case')
+
+    UATCase.objects.update(
+        notes_count=Coalesce(Subquery(children(Note).annotate(count=Count('pk')).values('count')), 0),
+        attachments_count=Coalesce(Subquery(children(Attachment).annotate(count=Count('pk')).values('count')), 0),
+        last_activity_at=Greatest(
+            'created_at',
+            Coalesce(Subquery(children(Note).annotate(latest=Max('created_at')).values('latest')), 'created_at'),
+            Coalesce(Subquery(children(Attachment).annotate(latest=Max('uploaded_at')).values('latest')), 'created_at'),
+        ),
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uat_tracker_app', '0008_add_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uatcase',
+            name='attachments_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='uatcase',
+            name='last_activity_at',
+            field=models.DateTimeField(blank=True, help_text='Latest of creation, note or attachment', null=True),
+        ),
+        migrations.AddField(
+            model_name='uatcase',
+            name='notes_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_case_activity, migrations.RunPython.noop),
+    ]
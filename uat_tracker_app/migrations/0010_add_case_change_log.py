@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:08
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uat_tracker_app', '0009_add_case_activity_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('company_id', models.IntegerField()),
+                ('requestor_id', models.IntegerField()),
+                ('case_id', models.IntegerField()),
+                ('object_type', models.CharField(choices=[('case', 'Case'), ('note', 'Note'), ('attachment', 'Attachment')], max_length=20)),
+                ('object_id', models.IntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Created or updated'), ('delete', 'Deleted')], max_length=20)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['company_id', 'id'], name='case_change_company_idx'), models.Index(fields=['requestor_id', 'id'], name='case_change_requestor_idx'), models.Index(fields=['changed_at'], name='case_change_changed_at_idx')],
+            },
+        ),
+    ]
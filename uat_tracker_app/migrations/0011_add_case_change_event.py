@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uat_tracker_app', '0010_add_case_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casechange',
+            name='event',
+            field=models.CharField(default='case_updated', help_text='Event name pushed by /api/events/, e.g. case_created', max_length=30),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:21
+
+from django.db import migrations, models
+
+# Frozen copy of models.parse_role_mask
+ROLE_BITS = {'admin': 1, 'manager': 2, 'user': 4}
+NO_KNOWN_ROLE = 8
+
+
+def backfill_role_masks(apps, schema_editor):
+    for model_name in ('DynamicPage', 'DynamicWidget', 'DynamicMenuItem'):
+        model = apps.get_model('uat_tracker_app', model_name)
+        rows = list(model.objects.exclude(allowed_roles='').only('id', 'allowed_roles'))
+        for row in rows:
+            roles = {role.strip() for role in row.allowed_roles.split(',') if role.strip()}
+            row.role_mask = sum(ROLE_BITS[role] for role in roles if role in ROLE_BITS) or (NO_KNOWN_ROLE if roles else 0)
+        model.objects.bulk_update(rows, ['role_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uat_tracker_app', '0011_add_case_change_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dynamicmenuitem',
+            name='role_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='dynamicpage',
+            name='role_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='dynamicwidget',
+            name='role_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_role_masks, migrations.RunPython.noop),
+    ]
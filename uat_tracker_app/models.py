@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
 from django.utils import timezone
 
@@ -123,7 +125,7 @@ class UATCase(models.Model):
     assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_cases')
     
     # Creatio integration
-    creatio_id = models.CharField(max_length=50, blank=True, null=True)
+    creatio_id = models.CharField(max_length=50, blank=True, null=True, db_index=True)
     sync_status = models.CharField(max_length=20, default='pending')  # pending, synced, failed
     sync_error = models.TextField(blank=True, null=True)
     
@@ -134,13 +136,112 @@ class UATCase(models.Model):
     due_date = models.DateTimeField(blank=True, null=True)
     resolved_at = models.DateTimeField(blank=True, null=True)
     
+    # Denormalized activity, maintained by the Note/Attachment signals and rebuild_case_counters
+    notes_count = models.IntegerField(default=0)
+    attachments_count = models.IntegerField(default=0)
+    last_activity_at = models.DateTimeField(blank=True, null=True, help_text="Latest of creation, note or attachment")
+    COUNTER_FIELDS = ('notes_count', 'attachments_count', 'last_activity_at')
+    
+    # Columns that decide which CaseStats bucket a case is counted in
+    STATS_BUCKET_FIELDS = ('company_id', 'status_id', 'priority_id', 'sync_status')
+    
+    @classmethod
+    def counter_expressions(cls):
+        """
+        Expressions computing the denormalized activity columns from the child tables
+        """
+        def latest(model, field):
+            return Subquery(model.objects.filter(case=OuterRef('pk')).order_by().values('case').annotate(
+                latest=Max(field)
+            ).values('latest'))
+        
+        def count(model):
+            return Coalesce(Subquery(model.objects.filter(case=OuterRef('pk')).order_by().values('case').annotate(
+                count=Count('pk')
+            ).values('count')), 0)
+        
+        return {
+            'notes_count': count(Note),
+            'attachments_count': count(Attachment),
+            'last_activity_at': Greatest(
+                'created_at',
+                Coalesce(latest(Note, 'created_at'), 'created_at'),
+                Coalesce(latest(Attachment, 'uploaded_at'), 'created_at'),
+            ),
+        }
+    
+    def get_stats_bucket(self):
+        """
+        Key of the CaseStats row this case is counted in
+        """
+        return tuple(getattr(self, name) for name in self.STATS_BUCKET_FIELDS)
+    
+    @classmethod
+    def allocate_case_numbers(cls, count=1):
+        """
+        Reserve count consecutive case numbers for the current year
+        """
+        year = timezone.now().year
+        first = CaseNumberSequence.allocate(year, count)
+        return [f"UAT-{year}-{number:04d}" for number in range(first, first + count)]
+    
     def save(self, *args, **kwargs):
-        if not self.case_number:
-            # Generate case number
-            year = timezone.now().year
-            count = UATCase.objects.filter(created_at__year=year).count() + 1
-            self.case_number = f"UAT-{year}-{count:04d}"
-        super().save(*args, **kwargs)
+        if self._state.adding:
+            if self.last_activity_at is None:
+                self.last_activity_at = self.created_at
+        elif kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            # Never write back counters that may have moved since this instance was loaded
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+                and field.attname in self.__dict__
+            ]
+        
+        with transaction.atomic():
+            if not self.case_number:
+                # The sequence row stays locked until the case is committed
+                self.case_number = self.allocate_case_numbers()[0]
+            
+            old_bucket = None
+            new_bucket = self.get_stats_bucket()
+            if not self._state.adding:
+                # The row's current bucket, locked until commit; this instance may have been loaded
+                # before another save moved the case
+                old_bucket = UATCase.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values_list(*self.STATS_BUCKET_FIELDS).first()
+                update_fields = kwargs.get('update_fields')
+                if old_bucket is not None and update_fields is not None:
+                    # Columns left out of update_fields keep the row's values
+                    written = {self._meta.get_field(name).attname for name in update_fields}
+                    new_bucket = tuple(
+                        value if name in written else old
+                        for name, value, old in zip(self.STATS_BUCKET_FIELDS, new_bucket, old_bucket)
+                    )
+            
+            # Read by the post_save change log receiver
+            self._sync_status_changed = old_bucket is not None and old_bucket[3] != new_bucket[3]
+            
+            super().save(*args, **kwargs)
+            
+            if old_bucket != new_bucket:
+                if old_bucket is not None:
+                    CaseStats.adjust(*old_bucket, delta=-1)
+                CaseStats.adjust(*new_bucket, delta=1)
+    
+    def save_sync_state(self, **sync_fields):
+        """
+        Write only sync columns (creatio_id, sync_status, sync_error, last_synced) onto the locked
+        current row, so edits made while a Creatio call was in flight are not overwritten
+        """
+        with transaction.atomic():
+            current = UATCase.objects.select_for_update().filter(pk=self.pk).first()
+            if current is None:
+                return
+            for field, value in sync_fields.items():
+                setattr(current, field, value)
+                setattr(self, field, value)
+            current.save(update_fields=list(sync_fields))
     
     def __str__(self):
         return f"{self.case_number}: {self.subject}"
@@ -151,6 +252,86 @@ class UATCase(models.Model):
             ("can_assign_cases", "Can assign cases to users"),
             ("can_view_all_company_cases", "Can view all company cases"),
         ]
+        # Shaped after the hot queries checked by the explain_hot_queries command
+        indexes = [
+            models.Index(fields=['requestor', '-created_at', '-id'], name='case_requestor_created_idx'),
+            models.Index(fields=['requestor', '-updated_at'], name='case_requestor_updated_idx'),
+            models.Index(fields=['company', '-updated_at'], name='case_company_updated_idx'),
+            models.Index(fields=['company', 'status'], name='case_company_status_idx'),
+            models.Index(fields=['company', 'priority'], name='case_company_priority_idx'),
+            models.Index(fields=['sync_status'], name='case_sync_status_idx'),
+            models.Index(fields=['last_synced'], name='case_last_synced_idx'),
+        ]
+
+class CaseStats(models.Model):
+    """
+    Materialized case counters per (company, status, priority, sync status) bucket
+    """
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='case_stats')
+    status = models.ForeignKey(Status, on_delete=models.CASCADE)
+    priority = models.ForeignKey(Priority, on_delete=models.CASCADE)
+    sync_status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    
+    @classmethod
+    def adjust(cls, company_id, status_id, priority_id, sync_status, delta):
+        """
+        Atomically add delta to a bucket, creating the bucket on first increment
+        """
+        bucket = cls.objects.filter(
+            company_id=company_id, status_id=status_id,
+            priority_id=priority_id, sync_status=sync_status
+        )
+        if bucket.update(count=F('count') + delta) or delta < 0:
+            return
+        cls.objects.get_or_create(
+            company_id=company_id, status_id=status_id,
+            priority_id=priority_id, sync_status=sync_status
+        )
+        bucket.update(count=F('count') + delta)
+    
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Apply {bucket: delta} changes collected by bulk writes that bypass UATCase.save()
+        """
+        for bucket, delta in deltas.items():
+            if delta:
+                cls.adjust(*bucket, delta=delta)
+    
+    def __str__(self):
+        return f"{self.company_id}/{self.status_id}/{self.priority_id}/{self.sync_status}: {self.count}"
+    
+    class Meta:
+        verbose_name_plural = "Case statistics"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['company', 'status', 'priority', 'sync_status'],
+                name='unique_case_stats_bucket'
+            ),
+        ]
+
+class CaseNumberSequence(models.Model):
+    """
+    Last case number handed out per year
+    """
+    year = models.IntegerField(unique=True)
+    last_value = models.IntegerField(default=0)
+    
+    @classmethod
+    def allocate(cls, year, count=1):
+        """
+        Reserve count consecutive numbers for the year and return the first one
+        """
+        with transaction.atomic():
+            sequence, _ = cls.objects.select_for_update().get_or_create(year=year)
+            first = sequence.last_value + 1
+            sequence.last_value += count
+            sequence.save(update_fields=['last_value'])
+        return first
+    
+    def __str__(self):
+        return f"{self.year}: {self.last_value}"
 
 class Note(models.Model):
     case = models.ForeignKey(UATCase, on_delete=models.CASCADE, related_name='notes')
@@ -160,6 +341,11 @@ class Note(models.Model):
     
     def __str__(self):
         return f"Note by {self.author.username} on {self.case.subject}"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['case', '-created_at'], name='note_case_created_idx'),
+        ]
 
 class Attachment(models.Model):
     case = models.ForeignKey(UATCase, on_delete=models.CASCADE, related_name='attachments')
@@ -170,8 +356,178 @@ class Attachment(models.Model):
     
     def __str__(self):
         return f"{self.filename} for {self.case.subject}"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['case', '-uploaded_at'], name='attachment_case_uploaded_idx'),
+        ]
+
+class SyncOutbox(models.Model):
+    """
+    Creatio sync operation queued in the same transaction as the local write,
+    drained by the run_sync_worker command
+    """
+    OPERATIONS = [
+        ('create_case', 'Create case'),
+        ('update_case', 'Update case'),
+        ('add_comment', 'Add comment'),
+    ]
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('failed', 'Failed'),
+    ]
+    
+    case = models.ForeignKey(UATCase, on_delete=models.CASCADE, related_name='outbox_entries')
+    operation = models.CharField(max_length=20, choices=OPERATIONS)
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not processed before this time (retry backoff or worker lease)")
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    @classmethod
+    def enqueue(cls, case, operation, note=None):
+        """
+        Queue an operation; a case update is coalesced into a push that is still waiting
+        """
+        if operation == 'update_case' and cls.objects.filter(
+            case=case, operation__in=['create_case', 'update_case'], status='pending'
+        ).exists():
+            return None
+        return cls.objects.create(case=case, operation=operation, note=note)
+    
+    @classmethod
+    def enqueue_updates(cls, case_ids):
+        """
+        Queue update_case for many cases with one insert, skipping cases whose push is still waiting
+        """
+        waiting = set(cls.objects.filter(
+            case_id__in=case_ids, operation__in=['create_case', 'update_case'], status='pending'
+        ).values_list('case_id', flat=True))
+        return cls.objects.bulk_create([
+            cls(case_id=case_id, operation='update_case') for case_id in case_ids if case_id not in waiting
+        ])
+    
+    def __str__(self):
+        return f"{self.get_operation_display()} for {self.case_id} ({self.status})"
+    
+    class Meta:
+        verbose_name_plural = "Sync outbox"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_due_idx'),
+        ]
+
+class CaseChange(models.Model):
+    """
+    Append-only log of case, note and attachment writes; its ID is the token of the changes feed
+    """
+    OBJECT_TYPES = [
+        ('case', 'Case'),
+        ('note', 'Note'),
+        ('attachment', 'Attachment'),
+    ]
+    ACTIONS = [
+        ('upsert', 'Created or updated'),
+        ('delete', 'Deleted'),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    company_id = models.IntegerField()
+    requestor_id = models.IntegerField()
+    case_id = models.IntegerField()
+    object_type = models.CharField(max_length=20, choices=OBJECT_TYPES)
+    object_id = models.IntegerField()
+    action = models.CharField(max_length=20, choices=ACTIONS)
+    event = models.CharField(max_length=30, help_text="Event name pushed by /api/events/, e.g. case_created")
+    changed_at = models.DateTimeField(default=timezone.now)
+    
+    @classmethod
+    def for_case(cls, case_scope, object_type, object_id, action='upsert', event=None):
+        """
+        Unsaved entry; case_scope is a case or a (case_id, company_id, requestor_id) tuple
+        """
+        if isinstance(case_scope, UATCase):
+            case_scope = (case_scope.id, case_scope.company_id, case_scope.requestor_id)
+        case_id, company_id, requestor_id = case_scope
+        return cls(
+            case_id=case_id, company_id=company_id, requestor_id=requestor_id,
+            object_type=object_type, object_id=object_id, action=action,
+            event=event or f'{object_type}_{"deleted" if action == "delete" else "updated"}'
+        )
+    
+    @classmethod
+    def record(cls, entries):
+        """
+        Write entries built with for_case() in one insert
+        """
+        return cls.objects.bulk_create(entries)
+    
+    def __str__(self):
+        return f"{self.id}: {self.action} {self.object_type} {self.object_id}"
+    
+    class Meta:
+        ordering = ['id']
+        # Deleted cases keep their log rows, so scope columns are plain integers, not foreign keys
+        indexes = [
+            models.Index(fields=['company_id', 'id'], name='case_change_company_idx'),
+            models.Index(fields=['requestor_id', 'id'], name='case_change_requestor_idx'),
+            models.Index(fields=['changed_at'], name='case_change_changed_at_idx'),
+        ]
+
 # Dynamic Admin Panel Models
-class DynamicPage(models.Model):
+
+# Role -> bit of a role mask; a blank allowed_roles is stored as 0 and lets every role in
+ROLE_BITS = {'admin': 1, 'manager': 2, 'user': 4}
+# Set when allowed_roles only names unknown roles, which no user has
+NO_KNOWN_ROLE = 8
+
+def parse_role_mask(allowed_roles):
+    """
+    Role mask of a comma-separated allowed_roles string
+    """
+    roles = [role.strip() for role in (allowed_roles or '').split(',') if role.strip()]
+    if not roles:
+        return 0
+    return sum(ROLE_BITS[role] for role in set(roles) if role in ROLE_BITS) or NO_KNOWN_ROLE
+
+def user_role_mask(user):
+    """
+    Roles of a user as a mask: 0 when anonymous, otherwise 'user' plus admin/manager from the profile
+    """
+    if not user.is_authenticated:
+        return 0
+    mask = ROLE_BITS['user']
+    profile = getattr(user, 'profile', None)
+    if profile is not None:
+        if profile.is_admin:
+            mask |= ROLE_BITS['admin']
+        if profile.can_assign_cases:
+            mask |= ROLE_BITS['manager']
+    return mask
+
+class RoleRestrictedModel(models.Model):
+    """
+    Keeps role_mask in step with allowed_roles, so requests test one integer instead of parsing CSV
+    """
+    role_mask = models.PositiveSmallIntegerField(default=0, editable=False)
+    
+    def save(self, *args, **kwargs):
+        self.role_mask = parse_role_mask(self.allowed_roles)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'allowed_roles' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'role_mask'}
+        super().save(*args, **kwargs)
+    
+    def allows(self, role_mask):
+        return not self.role_mask or bool(self.role_mask & role_mask)
+    
+    class Meta:
+        abstract = True
+
+class DynamicPage(RoleRestrictedModel):
     """
     Model for creating dynamic pages through admin panel
     """
@@ -197,7 +553,7 @@ class DynamicPage(models.Model):
     class Meta:
         ordering = ['menu_order', 'title']
 
-class DynamicWidget(models.Model):
+class DynamicWidget(RoleRestrictedModel):
     """
     Model for creating dashboard widgets through admin panel
     """
@@ -232,7 +588,7 @@ class DynamicWidget(models.Model):
     class Meta:
         ordering = ['order', 'title']
 
-class DynamicMenuItem(models.Model):
+class DynamicMenuItem(RoleRestrictedModel):
     """
     Model for creating custom menu items
     """
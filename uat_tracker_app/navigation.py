@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.cache import caches
+from .models import DynamicPage, DynamicWidget, DynamicMenuItem, NO_KNOWN_ROLE
+
+# Every role mask a user can have (anonymous is 0), so all cached entries can be dropped at once
+USER_ROLE_MASKS = range(NO_KNOWN_ROLE)
+
+def _navigation_cache():
+    """
+    Cache holding navigation and widget payloads, shared by every process so one invalidation reaches all
+    """
+    return caches[getattr(settings, 'NAVIGATION_CACHE', 'shared')]
+
+def _cached(key, build):
+    cache = _navigation_cache()
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, getattr(settings, 'NAVIGATION_CACHE_TTL', 3600))
+    return payload
+
+def build_navigation(role_mask):
+    """
+    Menu pages and menu items visible to a role mask
+    """
+    authenticated = bool(role_mask)
+    pages = DynamicPage.objects.filter(is_active=True, show_in_menu=True).only(
+        'id', 'title', 'slug', 'icon', 'menu_order', 'requires_login', 'role_mask'
+    )
+    menu_items = DynamicMenuItem.objects.filter(is_active=True).only(
+        'id', 'title', 'url', 'icon', 'parent_id', 'order', 'open_in_new_tab', 'requires_login', 'role_mask'
+    )
+    return {
+        'pages': [{
+            'id': page.id,
+            'title': page.title,
+            'slug': page.slug,
+            'icon': page.icon,
+            'menu_order': page.menu_order
+        } for page in pages if page.allows(role_mask) and (authenticated or not page.requires_login)],
+        'menu_items': [{
+            'id': item.id,
+            'title': item.title,
+            'url': item.url,
+            'icon': item.icon,
+            'parent_id': item.parent_id,
+            'order': item.order,
+            'open_in_new_tab': item.open_in_new_tab
+        } for item in menu_items if item.allows(role_mask) and (authenticated or not item.requires_login)],
+    }
+
+def build_widgets(role_mask):
+    """
+    Dashboard widgets visible to a role mask
+    """
+    return [{
+        'id': widget.id,
+        'title': widget.title,
+        'widget_type': widget.widget_type,
+        'content': widget.content,
+        'css_classes': widget.css_classes,
+        'width': widget.width,
+        'order': widget.order
+    } for widget in DynamicWidget.objects.filter(is_active=True) if widget.allows(role_mask)]
+
+def get_navigation(role_mask):
+    return _cached(f'navigation:{role_mask}', lambda: build_navigation(role_mask))
+
+def get_widgets(role_mask):
+    return _cached(f'dashboard-widgets:{role_mask}', lambda: build_widgets(role_mask))
+
+def clear_navigation_cache():
+    """
+    Drop the payloads of every role mask after a page, widget or menu item changed
+    """
+    _navigation_cache().delete_many(
+        [f'navigation:{mask}' for mask in USER_ROLE_MASKS] + [f'dashboard-widgets:{mask}' for mask in USER_ROLE_MASKS]
+    )
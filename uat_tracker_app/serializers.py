@@ -0,0 +1,154 @@
+from collections import namedtuple
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from .lookups import get_lookup, get_lookup_registry
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# values() paths a response field is built from, and how: get(row, lookup registry) -> value
+Field = namedtuple('Field', ['paths', 'get'])
+
+def column(path):
+    return Field((path,), lambda row, registry: row[path])
+
+def timestamp(path):
+    return Field((path,), lambda row, registry: row[path].isoformat() if row[path] else None)
+
+def lookup(field, attr='value'):
+    """
+    A lookup's value (or name or color) from the registry, without joining the lookup table
+    """
+    path = f'{field}_id'
+
+    def get(row, registry):
+        entry = registry.get(field, row[path]) or get_lookup(field, row[path])
+        return getattr(entry, attr)
+    return Field((path,), get)
+
+def full_name(relation, or_username=False):
+    """
+    A user's "first last" name like User.get_full_name(), None when the relation is empty
+    """
+    first, last, username = (f'{relation}__{name}' for name in ('first_name', 'last_name', 'username'))
+
+    def get(row, registry):
+        if row[f'{relation}_id'] is None:
+            return None
+        name = f'{row[first]} {row[last]}'.strip()
+        return (name or row[username]) if or_username else name
+    return Field((f'{relation}_id', first, last, username), get)
+
+class RowSerializer:
+    """
+    Builds response dicts from values() rows, reading only the columns of the requested fields
+    """
+
+    def __init__(self, fields, default=None):
+        self.fields = fields
+        self.default = tuple(default or fields)
+
+    def paths(self, names=None):
+        names = self.default if names is None else names
+        return {'id'} | {path for name in names for path in self.fields[name].paths}
+
+    def values(self, queryset, names=None, extra_paths=()):
+        """
+        The queryset as values() rows carrying what the fields need
+        """
+        return queryset.values(*self.paths(names), *extra_paths)
+
+    def serialize(self, rows, names=None):
+        names = self.default if names is None else names
+        getters = [(name, self.fields[name].get) for name in names]
+        # One registry for the whole batch rather than a version check per lookup
+        registry = get_lookup_registry()
+        return [{name: get(row, registry) for name, get in getters} for row in rows]
+
+    def serialize_instance(self, instance, names=None):
+        """
+        Serialize an object already in memory (e.g. just created) without reading it back
+        """
+        row = {}
+        for path in self.paths(names):
+            value = instance
+            for attr in path.split('__'):
+                value = getattr(value, attr) if value is not None else None
+            row[path] = value
+        return self.serialize([row], names)[0]
+
+CASE_SERIALIZER = RowSerializer({
+    'id': column('id'),
+    'case_number': column('case_number'),
+    'subject': column('subject'),
+    'priority': lookup('priority'),
+    'environment': lookup('environment'),
+    'case_type': lookup('case_type'),
+    'description': column('description'),
+    'reproduction_steps': column('reproduction_steps'),
+    'expected_result': column('expected_result'),
+    'actual_result': column('actual_result'),
+    'status': lookup('status'),
+    'requestor': column('requestor__username'),
+    'company': column('company__name'),
+    'assigned_to': full_name('assigned_to'),
+    'created_at': timestamp('created_at'),
+    'creatio_id': column('creatio_id'),
+    'sync_status': column('sync_status'),
+    'notes_count': column('notes_count'),
+    'attachments_count': column('attachments_count'),
+    'last_activity_at': timestamp('last_activity_at'),
+}, default=(
+    'id', 'case_number', 'subject', 'priority', 'environment', 'case_type', 'description', 'reproduction_steps',
+    'status', 'requestor', 'company', 'assigned_to', 'created_at', 'creatio_id', 'sync_status',
+    'notes_count', 'attachments_count', 'last_activity_at',
+))
+
+# Dashboard rows carry lookup names and colors rather than values
+RECENT_ACTIVITY_SERIALIZER = RowSerializer({
+    'id': column('id'),
+    'case_number': column('case_number'),
+    'subject': column('subject'),
+    'status': lookup('status', 'name'),
+    'status_color': lookup('status', 'color'),
+    'priority': lookup('priority', 'name'),
+    'priority_color': lookup('priority', 'color'),
+    'environment': lookup('environment', 'name'),
+    'requestor': full_name('requestor', or_username=True),
+    'assigned_to': full_name('assigned_to'),
+    'updated_at': timestamp('updated_at'),
+    'sync_status': column('sync_status'),
+})
+
+NOTE_SERIALIZER = RowSerializer({
+    'id': column('id'),
+    'case_id': column('case_id'),
+    'author': column('author__username'),
+    'content': column('content'),
+    'timestamp': timestamp('created_at'),
+}, default=('id', 'author', 'content', 'timestamp'))
+
+ATTACHMENT_SERIALIZER = RowSerializer({
+    'id': column('id'),
+    'case_id': column('case_id'),
+    'filename': column('filename'),
+    'uploaded_by': column('uploaded_by__username'),
+    'uploaded_at': timestamp('uploaded_at'),
+}, default=('id', 'filename', 'uploaded_by', 'uploaded_at'))
+
+def dumps(data):
+    """
+    JSON bytes, through orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=DjangoJSONEncoder().default)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+def json_response(data, status=200):
+    """
+    JsonResponse equivalent using the fast encoder
+    """
+    return HttpResponse(dumps(data), content_type='application/json', status=status)
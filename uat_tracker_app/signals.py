@@ -0,0 +1,119 @@
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .lookups import LOOKUP_MODELS, bump_lookup_version
+from .models import UATCase, CaseStats, CaseChange, Note, Attachment, DynamicPage, DynamicWidget, DynamicMenuItem
+from .navigation import clear_navigation_cache
+
+@receiver(post_delete, sender=UATCase)
+def remove_case_from_stats(sender, instance, **kwargs):
+    """
+    Decrement the statistics bucket of a deleted case (also covers bulk and cascade deletes)
+    """
+    bucket = getattr(instance, '_stats_bucket', None) or instance.get_stats_bucket()
+    CaseStats.adjust(*bucket, delta=-1)
+
+def record_activity(case_id, counter, delta, activity_at=None):
+    """
+    Move a case's child counter by delta; an addition also advances last_activity_at,
+    a removal recomputes it from the remaining children
+    """
+    if activity_at is not None:
+        last_activity_at = Greatest(Coalesce('last_activity_at', Value(activity_at)), Value(activity_at))
+    else:
+        last_activity_at = UATCase.counter_expressions()['last_activity_at']
+    UATCase.objects.filter(pk=case_id).update(
+        **{counter: F(counter) + delta},
+        last_activity_at=last_activity_at
+    )
+
+@receiver(post_save, sender=Note)
+def count_added_note(sender, instance, created, **kwargs):
+    if created:
+        record_activity(instance.case_id, 'notes_count', 1, instance.created_at)
+
+@receiver(post_delete, sender=Note)
+def count_removed_note(sender, instance, **kwargs):
+    record_activity(instance.case_id, 'notes_count', -1)
+
+@receiver(post_save, sender=Attachment)
+def count_added_attachment(sender, instance, created, **kwargs):
+    if created:
+        record_activity(instance.case_id, 'attachments_count', 1, instance.uploaded_at)
+
+@receiver(post_delete, sender=Attachment)
+def count_removed_attachment(sender, instance, **kwargs):
+    record_activity(instance.case_id, 'attachments_count', -1)
+
+@receiver(post_save, sender=UATCase)
+def log_case_saved(sender, instance, created, **kwargs):
+    if created:
+        event = 'case_created'
+    elif getattr(instance, '_sync_status_changed', False):
+        event = 'sync_status_changed'
+    else:
+        event = 'case_updated'
+    CaseChange.record([CaseChange.for_case(instance, 'case', instance.id, event=event)])
+
+@receiver(post_delete, sender=UATCase)
+def log_case_deleted(sender, instance, **kwargs):
+    CaseChange.record([CaseChange.for_case(instance, 'case', instance.id, 'delete')])
+
+def log_child_change(instance, object_type, action, event=None):
+    """
+    Log a note or attachment write together with its case, whose counters moved
+    """
+    if type(instance).case.is_cached(instance):
+        scope = (instance.case.id, instance.case.company_id, instance.case.requestor_id)
+    else:
+        row = UATCase.objects.filter(pk=instance.case_id).values_list('company_id', 'requestor_id').first()
+        if row is None:
+            # The case itself is being deleted and logs its own removal
+            return
+        scope = (instance.case_id, *row)
+    CaseChange.record([
+        CaseChange.for_case(scope, object_type, instance.id, action, event),
+        CaseChange.for_case(scope, 'case', instance.case_id),
+    ])
+
+@receiver(post_save, sender=Note)
+def log_note_saved(sender, instance, created, **kwargs):
+    log_child_change(instance, 'note', 'upsert', 'note_added' if created else None)
+
+@receiver(post_delete, sender=Note)
+def log_note_deleted(sender, instance, **kwargs):
+    log_child_change(instance, 'note', 'delete')
+
+@receiver(post_save, sender=Attachment)
+def log_attachment_saved(sender, instance, created, **kwargs):
+    log_child_change(instance, 'attachment', 'upsert', 'attachment_added' if created else None)
+
+@receiver(post_delete, sender=Attachment)
+def log_attachment_deleted(sender, instance, **kwargs):
+    log_child_change(instance, 'attachment', 'delete')
+
+def lookups_changed(sender, **kwargs):
+    """
+    Publish a new lookup version once the change is committed
+    """
+    transaction.on_commit(bump_lookup_version)
+
+for _, _, lookup_model in LOOKUP_MODELS:
+    post_save.connect(lookups_changed, sender=lookup_model, dispatch_uid=f'lookups-save-{lookup_model.__name__}')
+    post_delete.connect(lookups_changed, sender=lookup_model, dispatch_uid=f'lookups-delete-{lookup_model.__name__}')
+
+def navigation_changed(sender, **kwargs):
+    """
+    Drop cached navigation and widget payloads once the change is committed
+    """
+    transaction.on_commit(clear_navigation_cache)
+
+for navigation_model in (DynamicPage, DynamicWidget, DynamicMenuItem):
+    post_save.connect(
+        navigation_changed, sender=navigation_model, dispatch_uid=f'navigation-save-{navigation_model.__name__}'
+    )
+    post_delete.connect(
+        navigation_changed, sender=navigation_model, dispatch_uid=f'navigation-delete-{navigation_model.__name__}'
+    )
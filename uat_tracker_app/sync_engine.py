@@ -0,0 +1,83 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SyncEngine:
+    """
+    Runs Creatio sync operations on a bounded thread pool.
+
+    Operations submitted under the same key (e.g. a case ID) run one after another
+    in submission order; operations for different keys run concurrently, at most
+    `concurrency` at a time.
+    """
+
+    def __init__(self, concurrency):
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='creatio-sync')
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.queues = {}
+        self.pending = 0
+        self.errors = []
+
+    def submit(self, key, operation, *args):
+        """
+        Queue operation(*args) behind any earlier operations for the same key
+        """
+        with self.lock:
+            self.pending += 1
+            queue = self.queues.get(key)
+            if queue is not None:
+                queue.append((operation, args))
+                return
+            self.queues[key] = deque([(operation, args)])
+        self.executor.submit(self._drain, key)
+
+    def _drain(self, key):
+        """
+        Run every queued operation for a key in order, then release the worker
+        """
+        try:
+            while True:
+                with self.lock:
+                    queue = self.queues[key]
+                    if not queue:
+                        del self.queues[key]
+                        return
+                    operation, args = queue.popleft()
+
+                try:
+                    operation(*args)
+                except Exception as e:
+                    logger.error(f"Sync operation for {key} failed: {e}")
+                    with self.lock:
+                        self.errors.append((key, e))
+                finally:
+                    with self.lock:
+                        self.pending -= 1
+                        if not self.pending:
+                            self.idle.notify_all()
+        finally:
+            # Worker threads open their own database connections
+            connections.close_all()
+
+    def wait(self):
+        """
+        Block until every submitted operation has finished
+        """
+        with self.idle:
+            while self.pending:
+                self.idle.wait()
+
+    def shutdown(self):
+        self.wait()
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -1,3 +1,1377 @@
-from django.test import TestCase
+from collections import Counter
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
+import csv
+import json
+import threading
+import time
+import requests
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from . import creatio_service, events
+from .dashboard import get_dashboard_payload
+from .case_import import CaseImporter, parse_import_rows
+from .creatio_service import CreatioService
+from .lookups import bump_lookup_version, get_lookup_registry
+from .serializers import CASE_SERIALIZER, RECENT_ACTIVITY_SERIALIZER
+from .sync_engine import SyncEngine
+from .models import (
+    UATCase, Company, UserProfile, Priority, Status, Environment, CaseType, CaseStats,
+    CaseNumberSequence, Note, SyncOutbox, CaseChange, DynamicPage, DynamicMenuItem
+)
 
-# Create your tests here.
\ No newline at end of file
+
+@override_settings(LOOKUPS_VERSION_CHECK_INTERVAL=3600)
+class CaseTestCase(TestCase):
+    """
+    A company, a user with a profile in it and the standard lookup rows, shared by the case tests
+    """
+    is_admin = False
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = Company.objects.create(name='ACME Corporation')
+        cls.user = User.objects.create_user('testuser', password='test123', first_name='Test', last_name='User')
+        cls.profile = UserProfile.objects.create(user=cls.user, company=cls.company, is_admin=cls.is_admin)
+        cls.new, cls.in_progress, cls.resolved, cls.closed, cls.reopened, cls.cancelled = [
+            Status.objects.create(name=name, value=value, order=order)
+            for order, (name, value) in enumerate([
+                ('New', 'new'), ('In Progress', 'in-progress'), ('Resolved', 'resolved'),
+                ('Closed', 'closed'), ('Reopened', 'reopened'), ('Cancelled', 'cancelled'),
+            ])
+        ]
+        cls.low, cls.medium, cls.high = [
+            Priority.objects.create(name=name, value=value, color=color, order=order)
+            for order, (name, value, color) in enumerate([
+                ('Low', 'low', '#0a0'), ('Medium', 'medium', '#fa0'), ('High', 'high', '#f00'),
+            ])
+        ]
+        cls.environment = Environment.objects.create(name='Test', value='test')
+        cls.case_type = CaseType.objects.create(name='Bug', value='bug')
+
+    def setUp(self):
+        bump_lookup_version()
+
+    @classmethod
+    def create_case(cls, **fields):
+        """
+        A new case of the user's company; fields override the defaults
+        """
+        return UATCase.objects.create(**{
+            'subject': 'Login fails', 'description': 'Steps', 'requestor': cls.user, 'company': cls.company,
+            'status': cls.new, 'priority': cls.high, 'environment': cls.environment, 'case_type': cls.case_type,
+            **fields
+        })
+
+
+class DashboardStatsTests(CaseTestCase):
+    """
+    Dashboard statistics engine
+    """
+    is_admin = True
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for status, priority, sync_status in [
+            (cls.new, cls.high, 'pending'),
+            (cls.new, cls.low, 'synced'),
+            (cls.in_progress, cls.high, 'pending'),
+            (cls.resolved, cls.low, 'synced'),
+            (cls.reopened, cls.low, 'failed'),
+        ]:
+            cls.create_case(status=status, priority=priority, sync_status=sync_status)
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+        get_lookup_registry()
+
+    def test_counters_and_distributions(self):
+        stats = get_dashboard_payload(self.user, self.profile)['stats']
+
+        self.assertEqual(stats['total_cases'], 5)
+        self.assertEqual(stats['new_cases'], 2)
+        self.assertEqual(stats['in_progress_cases'], 1)
+        self.assertEqual(stats['resolved_cases'], 1)
+        self.assertEqual(stats['reopened_cases'], 1)
+        self.assertEqual(stats['closed_cases'], 0)
+        self.assertEqual(stats['open_cases'], 4)
+        self.assertEqual(stats['high_priority'], 2)
+        self.assertEqual(stats['pending_sync'], 2)
+        self.assertEqual(
+            [(row['name'], row['value']) for row in stats['status_distribution']],
+            [('New', 2), ('In Progress', 1), ('Resolved', 1), ('Reopened', 1)]
+        )
+        self.assertEqual(
+            [(row['name'], row['value']) for row in stats['priority_distribution']],
+            [('Low', 3), ('High', 2)]
+        )
+
+    def test_query_count_is_pinned(self):
+        # One aggregate for the counters plus one query for recent activity; lookups come from the registry
+        with self.assertNumQueries(2):
+            get_dashboard_payload(self.user, self.profile)
+
+        # Served from the per-company cache until the TTL expires
+        with self.assertNumQueries(0):
+            get_dashboard_payload(self.user, self.profile)
+
+
+class CaseStatsTests(CaseTestCase):
+    """
+    Materialized per-company case statistics
+    """
+
+    def buckets(self):
+        return {
+            (row.status_id, row.sync_status): row.count
+            for row in CaseStats.objects.filter(company=self.company)
+        }
+
+    def test_create_update_and_delete_move_cases_between_buckets(self):
+        first = self.create_case()
+        self.create_case()
+        self.assertEqual(self.buckets(), {(self.new.id, 'pending'): 2})
+
+        case = UATCase.objects.get(pk=first.pk)
+        case.status = self.resolved
+        case.sync_status = 'synced'
+        case.save()
+        self.assertEqual(self.buckets(), {(self.new.id, 'pending'): 1, (self.resolved.id, 'synced'): 1})
+
+        UATCase.objects.filter(pk=first.pk).delete()
+        self.assertEqual(self.buckets(), {(self.new.id, 'pending'): 1, (self.resolved.id, 'synced'): 0})
+
+    def test_saving_a_stale_instance_moves_the_case_from_its_current_bucket(self):
+        stale = UATCase.objects.get(pk=self.create_case().pk)
+        edited = UATCase.objects.get(pk=stale.pk)
+        edited.status = self.resolved
+        edited.save()
+
+        stale.sync_status = 'synced'
+        stale.save(update_fields=['sync_status'])
+        self.assertEqual(self.buckets(), {(self.new.id, 'pending'): 0, (self.resolved.id, 'pending'): 0,
+                                          (self.resolved.id, 'synced'): 1})
+
+        # A full save writes the stale status back, and the statistics follow the row
+        stale.save()
+        self.assertEqual(self.buckets(), {(self.new.id, 'pending'): 0, (self.resolved.id, 'pending'): 0,
+                                          (self.resolved.id, 'synced'): 0, (self.new.id, 'synced'): 1})
+
+    def test_rebuild_repairs_drift(self):
+        self.create_case()
+        CaseStats.objects.update(count=42)
+
+        call_command('rebuild_case_stats', stdout=StringIO())
+        self.assertEqual(self.buckets(), {(self.new.id, 'pending'): 1})
+
+    def test_case_numbers_come_from_the_yearly_sequence(self):
+        year = timezone.now().year
+        first = self.create_case()
+        second = self.create_case()
+        self.assertEqual(first.case_number, f'UAT-{year}-0001')
+        self.assertEqual(second.case_number, f'UAT-{year}-0002')
+
+        # Deleting a case never makes its number available again
+        first.delete()
+        self.assertEqual(self.create_case().case_number, f'UAT-{year}-0003')
+
+        self.assertEqual(UATCase.allocate_case_numbers(2), [f'UAT-{year}-0004', f'UAT-{year}-0005'])
+        self.assertEqual(CaseNumberSequence.objects.get(year=year).last_value, 5)
+
+
+class CaseActivityTests(CaseTestCase):
+    """
+    Denormalized note/attachment counters and last activity on UATCase
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.case = cls.create_case()
+
+    def add_note(self, minutes):
+        return Note.objects.create(
+            case=self.case, author=self.user, content='Checked',
+            created_at=self.case.created_at + timedelta(minutes=minutes)
+        )
+
+    def test_counters_follow_notes_and_survive_stale_saves(self):
+        stale = UATCase.objects.get(pk=self.case.pk)
+        first = self.add_note(5)
+        second = self.add_note(10)
+
+        # A save from an instance loaded before the notes must not reset the counters
+        stale.subject = 'Login fails on Safari'
+        stale.save()
+
+        case = UATCase.objects.get(pk=self.case.pk)
+        self.assertEqual((case.notes_count, case.last_activity_at), (2, second.created_at))
+
+        second.delete()
+        case = UATCase.objects.get(pk=self.case.pk)
+        self.assertEqual((case.notes_count, case.last_activity_at), (1, first.created_at))
+
+    def test_rebuild_repairs_drift(self):
+        self.add_note(5)
+        UATCase.objects.update(notes_count=7, attachments_count=3)
+
+        call_command('rebuild_case_counters', stdout=StringIO())
+        case = UATCase.objects.get(pk=self.case.pk)
+        self.assertEqual((case.notes_count, case.attachments_count), (1, 0))
+
+
+class LookupsEndpointTests(CaseTestCase):
+    """
+    Versioned, ETag-cached /api/lookups/
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def priority_names(self, response):
+        return [priority['name'] for priority in response.json()['lookups']['priorities']]
+
+    def test_repeat_loads_are_not_modified_until_a_lookup_changes(self):
+        response = self.client.get('/api/lookups/')
+        etag = response['ETag']
+        self.assertEqual(self.priority_names(response), ['Low', 'Medium', 'High'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/lookups/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([query for query in queries if 'priority' in query['sql']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.high.name = 'Urgent'
+            self.high.save()
+
+        response = self.client.get('/api/lookups/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.priority_names(response), ['Low', 'Medium', 'Urgent'])
+
+
+class LookupRegistryTests(CaseTestCase):
+    """
+    Case endpoints resolve lookup values through the in-process registry
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def post(self, url, data):
+        return self.client.post(url, json.dumps(data), content_type='application/json')
+
+    def test_create_and_update_by_value(self):
+        response = self.post('/api/cases/create/', {
+            'subject': 'Login fails', 'description': 'Steps', 'environment': 'test'
+        })
+        self.assertEqual(response.json()['case']['priority'], 'medium')
+        case = UATCase.objects.get(pk=response.json()['case']['id'])
+        self.assertEqual(
+            (case.status, case.priority, case.environment, case.case_type),
+            (self.new, self.medium, self.environment, self.case_type)
+        )
+
+        self.post(f'/api/cases/{case.id}/update-field/', {'field': 'status', 'value': 'resolved'})
+        case.refresh_from_db()
+        self.assertEqual(case.status, self.resolved)
+        self.assertEqual(case.notes.get().content, 'Status changed to: Resolved')
+
+        with self.assertNumQueries(5):
+            # Session, user, the two ETag marks and the cases page; no lookup joins or lookup queries
+            cases = self.client.get('/api/cases/?status=resolved').json()['cases']
+        self.assertEqual([row['status'] for row in cases], ['resolved'])
+
+    def test_unknown_value_is_rejected(self):
+        response = self.post('/api/cases/create/', {
+            'subject': 'Login fails', 'description': 'Steps', 'environment': 'staging'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UATCase.objects.exists())
+
+
+class ExportTests(CaseTestCase):
+    """
+    Streaming CSV / JSONL case export
+    """
+    is_admin = True
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for subject in ('Login fails', 'Logout fails'):
+            case = cls.create_case(subject=subject)
+            Note.objects.create(case=case, author=cls.user, content=f'{subject} on Safari')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_jsonl_streams_cases_with_notes(self):
+        response = self.client.get('/api/cases/export/?format=jsonl')
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['subject'] for row in rows], ['Login fails', 'Logout fails'])
+        self.assertEqual(rows[0]['priority'], 'high')
+        self.assertEqual([note['content'] for note in rows[1]['notes']], ['Logout fails on Safari'])
+
+    def test_user_without_a_profile_exports_their_own_cases(self):
+        loner = User.objects.create_user('loner', password='test123')
+        self.create_case(subject='Search fails', requestor=loner)
+        self.client.force_login(loner)
+
+        response = self.client.get('/api/cases/export/?format=jsonl&fields=subject')
+
+        self.assertEqual([json.loads(line) for line in b''.join(response.streaming_content).splitlines()],
+                         [{'subject': 'Search fails'}])
+
+    def test_command_writes_csv(self):
+        output = StringIO()
+        call_command('export_cases', '--chunk-size', '1', stdout=output, stderr=StringIO())
+        rows = list(csv.DictReader(StringIO(output.getvalue())))
+        self.assertEqual([row['case_number'][-4:] for row in rows], ['0001', '0002'])
+        self.assertTrue(rows[0]['notes'].endswith('testuser: Login fails on Safari'))
+
+    def test_fields_limit_columns_read_and_returned(self):
+        response = self.client.get('/api/cases/export/?format=csv&fields=subject,status')
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows, [
+            {'subject': 'Login fails', 'status': 'new'},
+            {'subject': 'Logout fails', 'status': 'new'},
+        ])
+        case_queries = [query['sql'] for query in queries if 'uat_tracker_app_uatcase' in query['sql']]
+        self.assertEqual(len(case_queries), 1)
+        self.assertNotIn('description', case_queries[0])
+        self.assertFalse(any('uat_tracker_app_note' in query['sql'] for query in queries))
+
+        cases = self.client.get('/api/cases/?fields=id,subject,notes_count').json()['cases']
+        self.assertEqual([set(row) for row in cases], [{'id', 'subject', 'notes_count'}] * 2)
+        self.assertEqual(self.client.get('/api/cases/?fields=subject,secret').status_code, 400)
+
+
+class BulkUpdateTests(CaseTestCase):
+    """
+    Bulk field updates across many cases
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = User.objects.create_user('other', password='test123')
+        cls.own = [cls.create_case(subject=f'Case {number}') for number in range(3)]
+        cls.foreign = cls.create_case(subject='Not mine', requestor=cls.other)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_updates_permitted_cases_in_one_statement(self):
+        case_ids = [case.id for case in self.own] + [self.foreign.id]
+        SyncOutbox.enqueue(self.own[0], 'create_case')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/cases/bulk-update/', json.dumps({
+                'case_ids': case_ids, 'fields': {'status': 'resolved'}
+            }), content_type='application/json')
+        self.assertEqual(response.json(), {'success': True, 'updated': 3, 'skipped': [self.foreign.id]})
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE "uat_tracker_app_uatcase"')]), 1)
+
+        self.assertEqual(UATCase.objects.filter(status=self.resolved).count(), 3)
+        self.assertEqual(UATCase.objects.get(pk=self.foreign.pk).status, self.new)
+        self.assertEqual(
+            list(UATCase.objects.filter(requestor=self.user).values_list('notes_count', flat=True)), [1, 1, 1]
+        )
+        self.assertEqual(Note.objects.filter(content='Status changed to: Resolved').count(), 3)
+        # The case still waiting for its create push is not queued twice
+        self.assertEqual(SyncOutbox.objects.count(), 3)
+        self.assertEqual(
+            CaseStats.objects.get(company=self.company, status=self.resolved, sync_status='pending').count, 3
+        )
+
+    def test_user_without_a_profile_updates_only_their_own_cases(self):
+        self.client.force_login(self.other)
+        case_ids = [self.own[0].id, self.foreign.id]
+
+        response = self.client.post('/api/cases/bulk-update/', json.dumps({
+            'case_ids': case_ids, 'fields': {'assigned_to': self.user.id}
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/cases/bulk-update/', json.dumps({
+            'case_ids': case_ids, 'fields': {'status': 'resolved'}
+        }), content_type='application/json')
+        self.assertEqual(response.json(), {'success': True, 'updated': 1, 'skipped': [self.own[0].id]})
+        self.assertEqual(UATCase.objects.get(pk=self.foreign.pk).status, self.resolved)
+
+    def test_malformed_requests_are_rejected(self):
+        case_ids = [case.id for case in self.own]
+        for body, error in (
+            ('{not json', 'Invalid JSON data'),
+            ([], 'Expected a JSON object'),
+            ({'case_ids': case_ids, 'fields': ['status']}, 'fields must set some of'),
+            ({'case_ids': case_ids, 'fields': {'assigned_to': 'me'}}, 'assigned_to must be a user ID or null'),
+            ({'case_ids': case_ids, 'fields': {'assigned_to': True}}, 'assigned_to must be a user ID or null'),
+        ):
+            response = self.client.post(
+                '/api/cases/bulk-update/', body if isinstance(body, str) else json.dumps(body),
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertTrue(response.json()['error'].startswith(error))
+
+        self.assertFalse(Note.objects.exists())
+
+
+@override_settings(CASE_CHANGES_SETTLE_SECONDS=0)
+class CaseChangesFeedTests(CaseTestCase):
+    """
+    Delta feed of case, note and attachment changes
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        # A fresh event buffer, as a newly started process would have
+        patcher = mock.patch.dict(events._state, latest_id=None, floor=0, buffer=[], streams=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def changes(self, token):
+        return self.client.get('/api/cases/changes/', {'since': token}).json()
+
+    def event_names(self, response):
+        return [
+            line.split(': ', 1)[1] for line in b''.join(response.streaming_content).decode().splitlines()
+            if line.startswith('event: ')
+        ]
+
+    def test_feed_returns_only_changes_since_the_token(self):
+        kept = self.create_case(subject='Login fails', requestor=self.user)
+        removed = self.create_case(subject='Logout fails', requestor=self.user)
+        token = self.client.get('/api/cases/changes/').json()['token']
+        self.assertEqual(self.changes(token)['cases'], [])
+
+        note = Note.objects.create(case=kept, author=self.user, content='Checked on Safari')
+        removed_id = removed.id
+        removed.delete()
+        feed = self.changes(token)
+
+        self.assertEqual([case['notes_count'] for case in feed['cases']], [1])
+        self.assertEqual([row['id'] for row in feed['notes']], [note.id])
+        self.assertEqual(feed['deleted'], {'cases': [removed_id], 'notes': [], 'attachments': []})
+        self.assertEqual(self.changes(feed['token'])['cases'], [])
+
+    def test_user_without_a_profile_gets_their_own_changes(self):
+        loner = User.objects.create_user('loner', password='test123')
+        case = self.create_case(subject='Login fails', requestor=loner)
+        self.create_case(subject='Logout fails', requestor=self.user)
+        self.client.force_login(loner)
+
+        self.assertEqual([row['id'] for row in self.changes(0)['cases']], [case.id])
+
+    @override_settings(EVENTS_STREAM_TIMEOUT=0)
+    def test_event_stream_pushes_named_events_since_the_last_event_id(self):
+        case = self.create_case(subject='Login fails', requestor=self.user)
+        token = self.client.get('/api/cases/changes/').json()['token']
+        Note.objects.create(case=case, author=self.user, content='Checked on Safari')
+        case.sync_status = 'synced'
+        case.save()
+        # The poller started after these changes, so the stream catches up from the database
+        events.poll_changes()
+
+        response = self.client.get('/api/events/', HTTP_LAST_EVENT_ID=token)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        self.assertEqual(self.event_names(response), ['note_added', 'case_updated', 'sync_status_changed'])
+
+    @override_settings(EVENTS_STREAM_TIMEOUT=0)
+    def test_user_without_a_profile_streams_their_own_events(self):
+        loner = User.objects.create_user('loner', password='test123')
+        self.create_case(subject='Logout fails', requestor=self.user)
+        self.create_case(subject='Login fails', requestor=loner)
+        events.poll_changes()
+        self.client.force_login(loner)
+
+        response = self.client.get('/api/events/', {'since': 0})
+
+        self.assertEqual(self.event_names(response), ['case_created'])
+
+    @override_settings(EVENTS_STREAM_TIMEOUT=0)
+    def test_event_streams_read_new_changes_from_the_poller_buffer(self):
+        other = User.objects.create_user('otheruser', password='test123')
+        UserProfile.objects.create(user=other, company=self.company)
+        case = self.create_case(subject='Login fails', requestor=self.user)
+        events.poll_changes()
+        token = self.client.get('/api/cases/changes/').json()['token']
+        Note.objects.create(case=case, author=self.user, content='Checked on Safari')
+        self.create_case(subject='Logout fails', requestor=other)
+        events.poll_changes()
+
+        response = self.client.get('/api/events/', HTTP_LAST_EVENT_ID=token)
+        with self.assertNumQueries(0):
+            names = self.event_names(response)
+
+        self.assertEqual(names, ['note_added', 'case_updated'])
+
+    @override_settings(EVENTS_STREAM_TIMEOUT=0, EVENTS_MAX_STREAMS=1)
+    def test_event_streams_beyond_the_process_limit_are_refused(self):
+        events.poll_changes()
+        response = self.client.get('/api/events/')
+
+        refused = self.client.get('/api/events/')
+        self.assertEqual(refused.status_code, 503)
+        self.assertEqual(refused['Retry-After'], '3')
+
+        b''.join(response.streaming_content)
+        self.assertEqual(self.client.get('/api/events/').status_code, 200)
+
+
+class CaseListTests(CaseTestCase):
+    """
+    Keyset pages and server-side filters of the case list
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.assignee = User.objects.create_user('assignee', password='test123')
+        cls.cases = [
+            cls.create_case(
+                subject=f'Case {number}', status=(cls.new, cls.resolved)[number % 2],
+                priority=(cls.high, cls.low)[number % 3 == 0], assigned_to=cls.assignee if number % 4 else None
+            )
+            for number in range(12)
+        ]
+        # Cases created in the same instant are ordered by ID
+        UATCase.objects.filter(id__in=[case.id for case in cls.cases[3:9]]).update(created_at=cls.cases[3].created_at)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def list_ids(self, **params):
+        """
+        IDs of every page, following next_cursor
+        """
+        pages = []
+        while True:
+            body = self.client.get('/api/cases/', {'fields': 'id', **params}).json()
+            pages.append([case['id'] for case in body['cases']])
+            if not body['next_cursor']:
+                return pages
+            params['cursor'] = body['next_cursor']
+
+    def test_cursor_pages_cover_every_case_once(self):
+        pages = self.list_ids(limit=5)
+
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        expected = list(UATCase.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual([case_id for page in pages for case_id in page], expected)
+
+    def test_filters_combine(self):
+        pages = self.list_ids(limit=1, status='new,unknown', priority='high', assigned_to=self.assignee.id)
+
+        expected = [
+            case.id for case in sorted(self.cases, key=lambda case: (case.created_at, case.id), reverse=True)
+            if case.status.value == 'new' and case.priority.value == 'high' and case.assigned_to_id
+        ]
+        self.assertEqual(pages, [[case_id] for case_id in expected])
+        self.assertEqual(len(expected), 2)
+        self.assertEqual(
+            self.list_ids(status='new', assigned_to='none'),
+            [[self.cases[8].id, self.cases[4].id, self.cases[0].id]]
+        )
+        self.assertEqual(self.client.get('/api/cases/', {'cursor': 'garbage'}).status_code, 400)
+
+
+class ConditionalGetTests(CaseTestCase):
+    """
+    ETag revalidation of case list and detail responses
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.case = cls.create_case()
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_unchanged_case_is_not_modified_until_a_note_is_added(self):
+        url = f'/api/cases/{self.case.id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Note.objects.create(case=self.case, author=self.user, content='Checked on Safari')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['case']['notes']), 1)
+
+    def test_case_list_etag_changes_when_a_note_is_removed(self):
+        note = Note.objects.create(case=self.case, author=self.user, content='Checked on Safari')
+        etag = self.client.get('/api/cases/')['ETag']
+        self.assertEqual(self.client.get('/api/cases/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/cases/?limit=5', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        note.delete()
+        response = self.client.get('/api/cases/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['cases'][0]['notes_count'], 0)
+
+    def test_case_list_etag_changes_when_a_case_is_deleted(self):
+        other = self.create_case(subject='Logout fails')
+        etag = self.client.get('/api/cases/')['ETag']
+
+        other.delete()
+        response = self.client.get('/api/cases/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([case['id'] for case in response.json()['cases']], [self.case.id])
+
+
+class ImportTests(CaseTestCase):
+    """
+    Bulk case import
+    """
+    is_admin = True
+
+    def test_valid_rows_are_inserted_and_queued_in_chunks(self):
+        lines = [
+            json.dumps({'subject': 'Login fails', 'description': 'Steps', 'environment': 'test'}),
+            json.dumps({'subject': 'Logout fails', 'description': 'Steps', 'environment': 'prod'}),
+            '{not json',
+            json.dumps({'subject': 'Search fails', 'description': 'Steps', 'environment': 'test',
+                        'created_at': '2024-03-01T10:00:00'}),
+        ]
+        importer = CaseImporter(self.company, self.user, chunk_size=2).run(parse_import_rows(lines, 'jsonl'))
+
+        self.assertEqual(importer.imported, 2)
+        self.assertEqual([line for line, _ in importer.errors], [2, 3])
+        self.assertEqual(
+            list(UATCase.objects.order_by('id').values_list('subject', 'case_number')),
+            [('Login fails', f'UAT-{timezone.now().year}-0001'), ('Search fails', f'UAT-{timezone.now().year}-0002')]
+        )
+        self.assertEqual(SyncOutbox.objects.filter(operation='create_case').count(), 2)
+        self.assertEqual(
+            CaseStats.objects.get(company=self.company, status=self.new, priority=self.medium).count, 2
+        )
+
+    def test_users_of_other_companies_are_rejected(self):
+        colleague = User.objects.create_user('colleague', password='test123')
+        UserProfile.objects.create(user=colleague, company=self.company)
+        outsider = User.objects.create_user('outsider', password='test123')
+        UserProfile.objects.create(user=outsider, company=Company.objects.create(name='Globex'))
+        lines = [
+            json.dumps({'subject': 'Login fails', 'description': 'Steps', 'environment': 'test',
+                        'requestor': 'colleague', 'assigned_to': 'colleague'}),
+            json.dumps({'subject': 'Logout fails', 'description': 'Steps', 'environment': 'test',
+                        'requestor': 'outsider'}),
+            json.dumps({'subject': 'Search fails', 'description': 'Steps', 'environment': 'test',
+                        'assigned_to': 'outsider'}),
+        ]
+        importer = CaseImporter(self.company, self.user).run(parse_import_rows(lines, 'jsonl'))
+
+        self.assertEqual(importer.imported, 1)
+        self.assertEqual(importer.errors, [(2, 'Unknown requestor: outsider'), (3, 'Unknown assigned_to: outsider')])
+        self.assertFalse(UATCase.objects.filter(requestor=outsider).exists())
+        self.assertEqual(UATCase.objects.get().assigned_to, colleague)
+
+    def test_endpoint_requires_admin_and_accepts_csv(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile(
+            'cases.csv', b'subject,description,environment,priority\nLogin fails,Steps,test,medium\n'
+        )
+        response = self.client.post('/api/cases/import/', {'file': upload})
+        self.assertEqual((response.json()['imported'], response.json()['rejected']), (1, 0))
+
+        self.user.profile.is_admin = False
+        self.user.profile.save()
+        response = self.client.post('/api/cases/import/', {'file': upload})
+        self.assertEqual(response.status_code, 403)
+
+
+class QueryPlanTests(TestCase):
+    """
+    Hot queries stay on their indexes
+    """
+
+    def test_hot_queries_avoid_full_scans(self):
+        call_command('explain_hot_queries', stdout=StringIO())
+
+
+class SerializerTests(CaseTestCase):
+    """
+    Shared values()-row serializers
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.case = cls.create_case()
+
+    def test_rows_and_instances_serialize_alike(self):
+        from_row = CASE_SERIALIZER.serialize(CASE_SERIALIZER.values(UATCase.objects.all()))
+        self.assertEqual(from_row, [CASE_SERIALIZER.serialize_instance(self.case)])
+        self.assertEqual((from_row[0]['priority'], from_row[0]['assigned_to']), ('high', None))
+
+        activity = RECENT_ACTIVITY_SERIALIZER.serialize(RECENT_ACTIVITY_SERIALIZER.values(UATCase.objects.all()))
+        self.assertEqual(
+            (activity[0]['priority'], activity[0]['priority_color'], activity[0]['requestor']),
+            ('High', '#f00', 'Test User')
+        )
+
+    def test_detail_with_only_notes_reads_no_case_columns(self):
+        Note.objects.create(case=self.case, author=self.user, content='Checked on Safari')
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            case = self.client.get(f'/api/cases/{self.case.id}/?fields=notes').json()['case']
+
+        self.assertEqual(list(case), ['notes'])
+        self.assertEqual([note['content'] for note in case['notes']], ['Checked on Safari'])
+        case_query = next(
+            query['sql'] for query in queries if query['sql'].startswith('SELECT "uat_tracker_app_uatcase"."id" FROM')
+        )
+        self.assertNotIn('description', case_query)
+
+    def test_benchmark_reports_rows_per_second(self):
+        output = StringIO()
+        call_command('benchmark_serializers', '--rows', '10', '--repeat', '1', stdout=output)
+        self.assertIn('case rows: serialize', output.getvalue())
+
+
+class DynamicNavigationTests(CaseTestCase):
+    """
+    Role-filtered navigation served from the per-role cache
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        DynamicPage.objects.create(title='Help', slug='help', content='Help')
+        cls.reports = DynamicPage.objects.create(
+            title='Reports', slug='reports', content='Reports', allowed_roles='admin'
+        )
+        DynamicPage.objects.create(title='Beta', slug='beta', content='Beta', allowed_roles='tester')
+        DynamicMenuItem.objects.create(title='Wiki', url='/wiki/', allowed_roles='manager, user')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_navigation_is_filtered_by_role_and_refreshed_on_change(self):
+        navigation = self.client.get('/api/dynamic-pages/').json()
+        self.assertEqual([page['slug'] for page in navigation['pages']], ['help'])
+        self.assertEqual([item['title'] for item in navigation['menu_items']], ['Wiki'])
+        self.assertEqual(self.client.get('/api/dynamic-pages/reports/').status_code, 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reports.allowed_roles = 'admin, user'
+            self.reports.save()
+
+        pages = self.client.get('/api/dynamic-pages/').json()['pages']
+        self.assertEqual([page['slug'] for page in pages], ['help', 'reports'])
+        with self.assertNumQueries(4):
+            # Session, user, profile and the cache entry; no page or menu item scan
+            self.client.get('/api/dynamic-pages/')
+
+
+class AdminPagesTests(TestCase):
+    """
+    Admin forms render with their configured fieldsets
+    """
+
+    def test_case_and_dynamic_content_forms_render(self):
+        admin_user = User.objects.create_superuser('admin', password='admin123')
+        self.client.force_login(admin_user)
+        for url in (
+            '/admin/uat_tracker_app/uatcase/add/',
+            '/admin/uat_tracker_app/dynamicpage/add/',
+            '/admin/uat_tracker_app/systemsetting/add/',
+        ):
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+
+
+class SyncWorkerTests(CaseTestCase):
+    """
+    Outbox draining by run_sync_worker against a mocked Creatio service
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.case = cls.create_case()
+
+    def setUp(self):
+        super().setUp()
+        self.service = mock.Mock()
+        self.service.create_case.return_value = {'Id': 'creatio-1'}
+        patcher = mock.patch(
+            'uat_tracker_app.management.commands.run_sync_worker.CreatioService', return_value=self.service
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_worker(self, *args):
+        call_command('run_sync_worker', '--once', *args, stdout=StringIO())
+
+    def enqueue_create_and_note(self):
+        create = SyncOutbox.enqueue(self.case, 'create_case')
+        note = Note.objects.create(case=self.case, author=self.user, content='Checked on Safari')
+        return create, SyncOutbox.enqueue(self.case, 'add_comment', note)
+
+    def test_case_pushes_coalesce_and_notes_follow_the_create(self):
+        self.enqueue_create_and_note()
+        self.assertIsNone(SyncOutbox.enqueue(self.case, 'update_case'))
+        SyncOutbox.objects.create(case=self.case, operation='update_case')
+
+        self.run_worker()
+
+        self.service.create_case.assert_called_once()
+        self.service.update_case.assert_not_called()
+        self.assertEqual(self.service.add_case_comment.call_args[0][0], 'creatio-1')
+        self.assertFalse(SyncOutbox.objects.exists())
+        self.case.refresh_from_db()
+        self.assertEqual((self.case.creatio_id, self.case.sync_status), ('creatio-1', 'synced'))
+
+    def test_later_entries_wait_for_an_earlier_unfinished_entry(self):
+        create, comment = self.enqueue_create_and_note()
+        # Backing off after a failure, then leased by another worker
+        for status in ('pending', 'processing'):
+            SyncOutbox.objects.filter(id=create.id).update(
+                status=status, available_at=timezone.now() + timedelta(minutes=5)
+            )
+            self.run_worker()
+
+            self.service.add_case_comment.assert_not_called()
+            comment.refresh_from_db()
+            self.assertEqual((comment.status, comment.attempts), ('pending', 0))
+
+    def test_failure_backs_off_the_case_entries(self):
+        self.service.create_case.side_effect = Exception('Creatio is down')
+        create, comment = self.enqueue_create_and_note()
+
+        self.run_worker('--max-attempts', '3')
+        self.run_worker('--max-attempts', '3')
+
+        self.assertEqual(self.service.create_case.call_count, 1)
+        create.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertEqual((create.status, create.attempts, create.last_error), ('pending', 1, 'Creatio is down'))
+        self.assertGreater(create.available_at, timezone.now() + timedelta(seconds=25))
+        self.assertEqual((comment.status, comment.available_at), ('pending', create.available_at))
+        self.service.add_case_comment.assert_not_called()
+
+    def test_final_failure_marks_the_case_failed(self):
+        self.service.create_case.side_effect = Exception('Creatio is down')
+        create = SyncOutbox.enqueue(self.case, 'create_case')
+
+        self.run_worker('--max-attempts', '1')
+
+        create.refresh_from_db()
+        self.assertEqual(create.status, 'failed')
+        self.case.refresh_from_db()
+        self.assertEqual((self.case.sync_status, self.case.sync_error), ('failed', 'Creatio is down'))
+
+    def test_edits_made_during_the_push_are_kept(self):
+        def create_case(case_data):
+            edited = UATCase.objects.get(pk=self.case.pk)
+            edited.subject = 'Login fails on Safari'
+            edited.status = self.resolved
+            edited.save()
+            return {'Id': 'creatio-1'}
+        self.service.create_case.side_effect = create_case
+        SyncOutbox.enqueue(self.case, 'create_case')
+
+        self.run_worker()
+
+        self.case.refresh_from_db()
+        self.assertEqual(
+            (self.case.subject, self.case.status, self.case.sync_status),
+            ('Login fails on Safari', self.resolved, 'synced')
+        )
+        self.assertEqual(
+            list(CaseStats.objects.filter(count__gt=0).values_list('status_id', 'sync_status', 'count')),
+            [(self.resolved.id, 'synced', 1)]
+        )
+
+
+def creatio_response(data, status_code=200):
+    """
+    Stand-in for a requests response carrying a JSON body
+    """
+    response = mock.Mock(status_code=status_code, content=json.dumps(data).encode())
+    response.json.return_value = data
+    response.raise_for_status.return_value = None
+    return response
+
+
+CREATIO_SETTINGS = dict(
+    CREATIO_BASE_URL='https://creatio.example.com', CREATIO_IDENTITY_URL='https://identity.example.com',
+    CREATIO_CLIENT_ID='uat-tracker', CREATIO_CLIENT_SECRET='secret', CREATIO_TOKEN_CACHE='default'
+)
+
+
+@override_settings(**CREATIO_SETTINGS)
+class CreatioTokenTests(SimpleTestCase):
+    """
+    OAuth tokens shared through the token cache and refreshed by one caller at a time
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.session = mock.Mock()
+        self.session.post.return_value = creatio_response({'access_token': 'token-1', 'expires_in': 3600})
+
+    def service(self):
+        service = CreatioService()
+        service.session = self.session
+        return service
+
+    def test_service_instances_share_the_cached_token(self):
+        self.assertEqual(self.service().get_access_token(), 'token-1')
+        self.assertEqual(self.service().get_access_token(), 'token-1')
+
+        self.session.post.assert_called_once()
+        self.assertEqual(self.session.post.call_args[0][0], 'https://identity.example.com/connect/token')
+
+    def test_short_lived_tokens_are_not_renewed_on_every_call(self):
+        self.session.post.return_value = creatio_response({'access_token': 'token-1', 'expires_in': 300})
+        with mock.patch.object(CreatioService, '_refresh_in_background') as refresh_in_background:
+            tokens = [self.service().get_access_token() for _ in range(5)]
+
+        self.assertEqual(tokens, ['token-1'] * 5)
+        self.session.post.assert_called_once()
+        refresh_in_background.assert_not_called()
+
+    def test_concurrent_callers_wait_for_one_refresh(self):
+        def slow_token(*args, **kwargs):
+            time.sleep(0.2)
+            return creatio_response({'access_token': 'token-1', 'expires_in': 3600})
+        self.session.post.side_effect = slow_token
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(self.service().get_access_token())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(tokens, ['token-1'] * 5)
+        self.session.post.assert_called_once()
+
+    def test_timed_out_wait_leaves_the_other_workers_lock(self):
+        service = self.service()
+        key = service._token_cache_key(service._get_config_values())
+        cache.add(f'{key}:lock', True)
+        with mock.patch.object(creatio_service, 'TOKEN_LOCK_TIMEOUT', 0):
+            self.assertEqual(service.get_access_token(), 'token-1')
+
+        self.assertTrue(cache.get(f'{key}:lock'))
+
+    def test_rejected_token_is_dropped_from_the_cache(self):
+        service = self.service()
+        service.get_access_token()
+        rejected = creatio_response({}, status_code=401)
+        rejected.raise_for_status.side_effect = requests.exceptions.HTTPError(response=rejected)
+        self.session.get.return_value = rejected
+        with self.assertRaises(Exception):
+            service.make_authenticated_request('GET', 'Case')
+
+        self.session.post.return_value = creatio_response({'access_token': 'token-2', 'expires_in': 3600})
+        self.assertEqual(self.service().get_access_token(), 'token-2')
+
+
+class FakeCreatioHandler(BaseHTTPRequestHandler):
+    """
+    Keep-alive HTTP/1.1 server answering token requests and OData reads
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.reply({'value': []})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.reply({'access_token': 'token-1', 'expires_in': 3600})
+
+    def reply(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(CREATIO_CLIENT_ID='uat-tracker', CREATIO_CLIENT_SECRET='secret', CREATIO_TOKEN_CACHE='default')
+class CreatioTransportTests(SimpleTestCase):
+    """
+    Pooled keep-alive sessions and their connection reuse metrics
+    """
+
+    def setUp(self):
+        cache.clear()
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FakeCreatioHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = f'http://127.0.0.1:{server.server_address[1]}'
+        for patcher in (mock.patch.dict(creatio_service._sessions, clear=True),
+                        mock.patch.dict(creatio_service._tenant_slots, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: [session.close() for session in creatio_service._sessions.values()])
+
+    def test_requests_reuse_one_pooled_connection(self):
+        with self.settings(CREATIO_BASE_URL=self.url, CREATIO_IDENTITY_URL=self.url):
+            service = CreatioService()
+            for _ in range(3):
+                service.make_authenticated_request('GET', 'Case', params={'$top': 1})
+            # Later service instances share the process-wide session
+            CreatioService().make_authenticated_request('GET', 'Case')
+
+        self.assertIs(service.session, creatio_service.get_session())
+        self.assertEqual(creatio_service.get_transport_metrics(), {
+            'default': {'requests': 5, 'connections_opened': 1, 'connections_reused': 4}
+        })
+
+
+@override_settings(**CREATIO_SETTINGS)
+class CreatioLookupTests(SimpleTestCase):
+    """
+    Creatio lookup IDs resolved from tables loaded once per company
+    """
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.dict(creatio_service._lookup_tables, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tables = {
+            'CasePriority': [{'Id': 'priority-high', 'Name': 'High'}, {'Id': 'priority-low', 'Name': 'Low'}],
+            'CaseStatus': [{'Id': 'status-new', 'Name': 'New'}, {'Id': 'status-progress', 'Name': 'In Progress'}],
+            'CaseCategory': [{'Id': 'category-bug', 'Name': 'Bug'}],
+        }
+        self.session = mock.Mock()
+        self.session.post.return_value = creatio_response({'access_token': 'token-1', 'expires_in': 3600})
+        self.session.get.side_effect = lambda url, **kwargs: creatio_response(
+            {'value': self.tables[url.rsplit('/', 1)[1]]}
+        )
+        self.service = CreatioService()
+        self.service.session = self.session
+
+    def test_tables_load_once_and_resolve_names(self):
+        self.assertEqual(self.service._get_priority_id('High'), 'priority-high')
+        self.assertEqual(self.service._get_status_id(' new '), 'status-new')
+        self.assertEqual(self.service._get_status_id('in'), 'status-progress')
+        self.assertEqual(self.service._get_category_id('Bug'), 'category-bug')
+
+        self.assertEqual(self.session.get.call_count, 3)
+
+    def test_miss_reloads_tables_loaded_more_than_an_interval_ago(self):
+        self.service._get_priority_id('High')
+        self.tables['CasePriority'].append({'Id': 'priority-urgent', 'Name': 'Urgent'})
+
+        # Tables loaded a moment ago are not reloaded for a missing name
+        self.assertIsNone(self.service._get_priority_id('Urgent'))
+        self.assertEqual(self.session.get.call_count, 3)
+
+        creatio_service._lookup_tables['default']['loaded_at'] -= creatio_service.LOOKUP_MISS_REFRESH_INTERVAL
+        self.assertEqual(self.service._get_priority_id('Urgent'), 'priority-urgent')
+        self.assertEqual(self.session.get.call_count, 6)
+
+    def test_tables_reload_after_the_ttl(self):
+        self.service._get_priority_id('High')
+        with self.settings(CREATIO_LOOKUP_TTL=0):
+            self.service._get_priority_id('High')
+
+        self.assertEqual(self.session.get.call_count, 6)
+
+
+@override_settings(**CREATIO_SETTINGS)
+class CreatioBatchTests(CaseTestCase):
+    """
+    Pending cases pushed by sync_creatio, one by one or in DataService BatchQuery requests
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.created = cls.create_case(subject='Login fails')
+        cls.updated = cls.create_case(subject='Logout fails', creatio_id='creatio-2')
+        cls.rejected = cls.create_case(subject='Search fails')
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+        patcher = mock.patch.dict(creatio_service._lookup_tables, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def resolve_meanwhile(self):
+        """
+        A user resolving the first case while its push is in flight
+        """
+        edited = UATCase.objects.get(pk=self.created.pk)
+        edited.status = self.resolved
+        edited.save()
+
+    def assert_kept_edit(self):
+        case = UATCase.objects.get(pk=self.created.pk)
+        self.assertEqual((case.status, case.sync_status, case.creatio_id), (self.resolved, 'synced', 'creatio-1'))
+        self.assertEqual(
+            set(CaseStats.objects.filter(count__gt=0).values_list('status_id', 'sync_status', 'count')),
+            {(status_id, sync_status, count) for (status_id, sync_status), count in Counter(
+                UATCase.objects.values_list('status_id', 'sync_status')
+            ).items()}
+        )
+        self.assertFalse(CaseStats.objects.filter(count__lt=0).exists())
+
+    def test_edits_made_during_a_push_are_kept(self):
+        def create_case(case_data):
+            if case_data['subject'] == 'Login fails':
+                self.resolve_meanwhile()
+                return {'Id': 'creatio-1'}
+            return {'Id': 'creatio-3'}
+        service = mock.Mock()
+        service.iter_case_pages.return_value = iter([])
+        service.create_case.side_effect = create_case
+        with mock.patch('uat_tracker_app.management.commands.sync_creatio.CreatioService', return_value=service):
+            call_command('sync_creatio', stdout=StringIO())
+
+        self.assert_kept_edit()
+
+    def test_edits_made_during_a_batch_push_are_kept(self):
+        def push_cases_batch(operations):
+            self.resolve_meanwhile()
+            new_ids = {'Login fails': 'creatio-1', 'Search fails': 'creatio-3'}
+            return [{'success': True, 'Id': creatio_id or new_ids[data['subject']]} for creatio_id, data in operations]
+        service = mock.Mock()
+        service.iter_case_pages.return_value = iter([])
+        service.push_cases_batch.side_effect = push_cases_batch
+        with mock.patch('uat_tracker_app.management.commands.sync_creatio.CreatioService', return_value=service):
+            call_command('sync_creatio', '--batch-size', '3', stdout=StringIO())
+
+        self.assert_kept_edit()
+
+    def test_batch_results_map_back_to_operations_in_order(self):
+        session = mock.Mock()
+        session.post.return_value = creatio_response({'access_token': 'token-1', 'expires_in': 3600})
+        session.get.return_value = creatio_response({'value': []})
+        session.request.return_value = creatio_response({'queryResults': [
+            {'success': True, 'id': 'creatio-1'},
+            {'success': True},
+            {'success': False, 'errorInfo': {'message': 'Subject is required'}},
+        ]})
+        service = CreatioService()
+        service.session = session
+
+        results = service.push_cases_batch([
+            (None, {'subject': 'Login fails'}),
+            ('creatio-2', {'subject': 'Logout fails'}),
+            (None, {'subject': ''}),
+            (None, {'subject': 'Search fails'}),
+        ])
+
+        self.assertEqual(results, [
+            {'success': True, 'Id': 'creatio-1'},
+            {'success': True, 'Id': 'creatio-2'},
+            {'success': False, 'error': 'Subject is required'},
+            {'success': False, 'error': 'No result returned for batch item'},
+        ])
+        session.request.assert_called_once()
+        method, url = session.request.call_args[0]
+        self.assertEqual((method, url), ('POST', 'https://creatio.example.com/0/DataService/json/SyncReply/BatchQuery'))
+        self.assertEqual(
+            [item['__type'].rsplit('.', 1)[1] for item in session.request.call_args[1]['json']['items']],
+            ['InsertQuery', 'UpdateQuery', 'InsertQuery', 'InsertQuery']
+        )
+
+    def test_failed_batch_items_stay_pending(self):
+        service = mock.Mock()
+        service.iter_case_pages.return_value = iter([])
+        service.push_cases_batch.side_effect = lambda operations: [
+            {'success': True, 'Id': creatio_id or 'creatio-1'} if data['subject'] != 'Search fails'
+            else {'success': False, 'error': 'Subject is required'}
+            for creatio_id, data in operations
+        ]
+        with mock.patch('uat_tracker_app.management.commands.sync_creatio.CreatioService', return_value=service):
+            call_command('sync_creatio', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(service.push_cases_batch.call_count, 2)
+        self.assertEqual(
+            list(UATCase.objects.order_by('id').values_list('creatio_id', 'sync_status')),
+            [('creatio-1', 'synced'), ('creatio-2', 'synced'), (None, 'pending')]
+        )
+
+
+class SyncEngineTests(SimpleTestCase):
+    """
+    Per-key ordering and bounded concurrency of the sync engine
+    """
+
+    def test_operations_of_a_key_run_in_order_and_keys_run_in_parallel(self):
+        # Both keys must be running at once to get past the barrier
+        barrier = threading.Barrier(2, timeout=5)
+        lock = threading.Lock()
+        running = []
+        peak = []
+        done = {'a': [], 'b': [], 'c': []}
+
+        def operation(key, number):
+            with lock:
+                running.append(key)
+                peak.append(len(running))
+            if number == 0 and key != 'c':
+                barrier.wait()
+            time.sleep(0.01)
+            with lock:
+                running.remove(key)
+                done[key].append(number)
+
+        with SyncEngine(2) as engine:
+            for number in range(4):
+                for key in done:
+                    engine.submit(key, operation, key, number)
+
+        self.assertEqual(done, {key: [0, 1, 2, 3] for key in done})
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(engine.errors, [])
+
+    def test_a_failed_operation_does_not_stop_its_key(self):
+        done = []
+
+        def operation(number):
+            if number == 1:
+                raise ValueError('Creatio is down')
+            done.append(number)
+
+        with SyncEngine(2) as engine:
+            for number in range(3):
+                engine.submit('case-1', operation, number)
+
+        self.assertEqual(done, [0, 2])
+        self.assertEqual([(key, str(error)) for key, error in engine.errors], [('case-1', 'Creatio is down')])
+
+
+@override_settings(**CREATIO_SETTINGS)
+class CreatioPullTests(SimpleTestCase):
+    """
+    Paged pulls of updated Creatio cases
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.session = mock.Mock()
+        self.session.post.return_value = creatio_response({'access_token': 'token-1', 'expires_in': 3600})
+        self.service = CreatioService()
+        self.service.session = self.session
+        self.rows = [
+            {'Id': f'creatio-{number}', 'Subject': f'Case {number}', 'Status': {'Name': 'New'}, 'Priority': None}
+            for number in range(5)
+        ]
+        self.skips = []
+
+    def pages(self, limit):
+        def get(url, params=None, **kwargs):
+            skip = params.get('$skip', 0)
+            self.skips.append(skip)
+            return creatio_response({'value': self.rows[skip:skip + min(params['$top'], limit)]})
+        return get
+
+    def test_server_capping_pages_below_top_without_a_next_link(self):
+        self.session.get.side_effect = self.pages(limit=2)
+
+        pages = list(self.service.iter_case_pages(page_size=10))
+
+        self.assertEqual([[row['Id'] for row in page] for page in pages], [
+            ['creatio-0', 'creatio-1'], ['creatio-2', 'creatio-3'], ['creatio-4']
+        ])
+        self.assertEqual(self.skips, [0, 2, 4])
+        self.assertEqual(pages[0][0]['Status'], 'New')
+
+    def test_short_page_from_an_uncapped_server_ends_the_pull(self):
+        self.session.get.side_effect = self.pages(limit=10)
+
+        pages = list(self.service.iter_case_pages(page_size=3))
+
+        self.assertEqual([len(page) for page in pages], [3, 2])
+        self.assertEqual(self.skips, [0, 3])
+
+    def test_next_links_are_followed(self):
+        self.session.get.side_effect = [
+            creatio_response({'value': self.rows[:2], '@odata.nextLink': 'https://creatio.example.com/0/odata/Case?page=2'}),
+            creatio_response({'value': self.rows[2:]}),
+        ]
+
+        pages = list(self.service.iter_case_pages(page_size=10))
+
+        self.assertEqual([len(page) for page in pages], [2, 3])
+        self.assertEqual(self.session.get.call_args[0][0], 'https://creatio.example.com/0/odata/Case?page=2')
+
+
+class CreatioApplyTests(CaseTestCase):
+    """
+    Pulled Creatio pages applied to local cases in bulk
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.cases = [
+            cls.create_case(subject=f'Case {number}', creatio_id=f'creatio-{number}', sync_status='synced')
+            for number in range(3)
+        ]
+
+    def test_pages_are_applied_with_one_update_each(self):
+        service = mock.Mock()
+        service.iter_case_pages.return_value = iter([
+            [
+                {'Id': 'creatio-0', 'Subject': 'Login fails', 'Status': 'Resolved', 'Priority': 'Low'},
+                {'Id': 'creatio-1', 'Subject': 'Case 1', 'Status': 'New', 'Priority': 'High'},
+                {'Id': 'creatio-9', 'Subject': 'Not here', 'Status': 'New', 'Priority': 'High'},
+            ],
+            [{'Id': 'creatio-2', 'Subject': None, 'Status': 'Unknown', 'Priority': 'Low'}],
+        ])
+        latest_change = CaseChange.objects.order_by('-id').values_list('id', flat=True).first()
+        stdout = StringIO()
+
+        with mock.patch('uat_tracker_app.management.commands.sync_creatio.CreatioService', return_value=service):
+            with CaptureQueriesContext(connection) as queries:
+                call_command('sync_creatio', '--full-sync', stdout=stdout)
+
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE "uat_tracker_app_uatcase"')]), 2)
+        self.assertIn('Pulled 4 updates from Creatio', stdout.getvalue())
+        self.assertEqual(
+            list(UATCase.objects.order_by('id').values_list('subject', 'status', 'priority')),
+            [('Login fails', self.resolved.id, self.low.id), ('Case 1', self.new.id, self.high.id),
+             ('Case 2', self.new.id, self.low.id)]
+        )
+        self.assertEqual(
+            sorted(CaseChange.objects.filter(id__gt=latest_change).values_list('case_id', flat=True)),
+            [self.cases[0].id, self.cases[2].id]
+        )
+        self.assertEqual(
+            sorted(CaseStats.objects.filter(company=self.company, count__gt=0).values_list('status', 'priority', 'count')),
+            sorted([(self.resolved.id, self.low.id, 1), (self.new.id, self.high.id, 1), (self.new.id, self.low.id, 1)])
+        )
@@ -15,6 +15,11 @@ urlpatterns = [
     # Cases
     path('api/cases/', views.get_user_cases, name='get_user_cases'),
     path('api/cases/create/', views.create_case, name='create_case'),
+    path('api/cases/changes/', views.get_case_changes, name='get_case_changes'),
+    path('api/events/', views.case_events, name='case_events'),
+    path('api/cases/export/', views.export_cases, name='export_cases'),
+    path('api/cases/import/', views.import_cases, name='import_cases'),
+    path('api/cases/bulk-update/', views.bulk_update_cases, name='bulk_update_cases'),
     path('api/cases/<int:case_id>/', views.get_case_details, name='get_case_details'),
     path('api/cases/<int:case_id>/update-field/', views.update_case_field, name='update_case_field'),
     path('api/cases/<int:case_id>/add-note/', views.add_note, name='add_note'),
@@ -1,20 +1,43 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.contrib.auth.models import User
+from django.conf import settings
 from django.utils import timezone
+from django.utils.crypto import md5
+from django.utils.http import parse_etags
 from django.db import transaction
+from django.db.models import F, Max, Q
+from collections import Counter
+from datetime import datetime, timedelta
+import base64
+import io
 import json
 import logging
+import os
+import time
 from .models import (
     UATCase, Note, Attachment, Company, UserProfile, CreatioConfig,
-    Priority, Status, Environment, CaseType
+    Priority, Status, Environment, CaseType, SyncOutbox, CaseStats, CaseChange
+)
+from .creatio_service import CreatioService, get_transport_metrics
+from .dashboard import get_dashboard_payload, get_scoped_cases
+from .events import EVENTS_RETRY_MS, open_stream
+from .export import EXPORT_FORMATS, iter_export_rows, parse_export_columns
+from .case_import import IMPORT_FORMATS, CaseImporter, parse_import_rows
+from .serializers import (
+    ATTACHMENT_SERIALIZER, CASE_SERIALIZER, NOTE_SERIALIZER, RECENT_ACTIVITY_SERIALIZER, json_response
+)
+from .lookups import (
+    LOOKUP_MODELS, get_lookup, get_lookup_etag, get_lookup_registry, get_lookup_version,
+    get_lookups_payload, resolve_lookup_id
 )
-from .creatio_service import CreatioService
 
 logger = logging.getLogger(__name__)
 
@@ -67,34 +90,250 @@ def user_logout(request):
     logout(request)
     return JsonResponse({'success': True})
 
+CASES_PAGE_SIZE = 50
+CASES_MAX_PAGE_SIZE = 200
+BULK_UPDATE_MAX_CASES = 1000
+CHANGES_PAGE_SIZE = 500
+BULK_UPDATE_FIELDS = {'status', 'priority', 'environment', 'case_type', 'assigned_to'}
+
+def _encode_cursor(created_at, case_id):
+    """
+    Encode a (created_at, id) keyset position as an opaque cursor token
+    """
+    raw = f"{created_at.isoformat()}|{case_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor):
+    """
+    Decode a cursor token back into a (created_at, id) keyset position
+    """
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    created_at, case_id = raw.rsplit('|', 1)
+    return datetime.fromisoformat(created_at), int(case_id)
+
+# Keys of a /api/cases/{id}/ case when ?fields= is not given
+CASE_DETAIL_FIELDS = (
+    'id', 'subject', 'priority', 'environment', 'case_type', 'description', 'reproduction_steps',
+    'status', 'requestor', 'company', 'created_at', 'creatio_id', 'sync_status', 'notes', 'attachments',
+)
+
+def _requested_fields(request, default, allowed):
+    """
+    Fields named in ?fields= (comma-separated), or the default ones; raises ValueError on unknown names
+    """
+    if not request.GET.get('fields'):
+        return default
+    fields = [field.strip() for field in request.GET['fields'].split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+    return tuple(dict.fromkeys(fields))
+
+def _weak_etag(*parts):
+    digest = md5('|'.join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+def _change_log_scope(user):
+    """
+    Change log filter of the user's scope: the whole company for admins, otherwise
+    their own cases (also for users without a profile)
+    """
+    if hasattr(user, 'profile') and user.profile.is_admin:
+        return {'company_id': user.profile.company_id}
+    return {'requestor_id': user.id}
+
+def _case_list_etag(request):
+    """
+    ETag of a /api/cases/ page from the user's latest case write and latest change log entry,
+    which also covers note removals and case deletes; both are single index seeks
+    """
+    updated_at = UATCase.objects.filter(requestor=request.user).aggregate(Max('updated_at'))['updated_at__max']
+    latest_change = CaseChange.objects.filter(
+        requestor_id=request.user.id
+    ).order_by('-id').values_list('id', flat=True).first()
+    return _weak_etag(
+        'cases', request.user.id, request.GET.urlencode(), get_lookup_version(), updated_at, latest_change
+    )
+
+def _case_detail_etag(request, case_id):
+    """
+    ETag of a case detail response from updated_at and the note and attachment high-water marks
+    kept on the case row, so a revalidation costs one indexed lookup and no serialization
+    """
+    marks = UATCase.objects.filter(id=case_id, requestor=request.user).values_list(
+        'updated_at', 'notes_count', 'attachments_count', 'last_activity_at'
+    ).first()
+    if marks is None:
+        return None
+    return _weak_etag('case', case_id, request.GET.urlencode(), get_lookup_version(), *marks)
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_case_list_etag)
 def get_user_cases(request):
     """
-    Get cases for the logged-in user
+    Get cases for the logged-in user, newest first, one keyset page at a time
+    """
+    try:
+        page_size = min(int(request.GET.get('limit', CASES_PAGE_SIZE)), CASES_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid limit'}, status=400)
+    if page_size < 1:
+        return JsonResponse({'success': False, 'error': 'Invalid limit'}, status=400)
+
+    cases = UATCase.objects.filter(requestor=request.user)
+
+    # Server-side filters; lookups are passed by value and accept comma-separated lists
+    registry = get_lookup_registry()
+    for field in ('status', 'priority', 'environment'):
+        if request.GET.get(field):
+            entries = [registry.get_by_value(field, value) for value in request.GET[field].split(',')]
+            cases = cases.filter(**{f'{field}_id__in': [entry.id for entry in entries if entry]})
+
+    assignee = request.GET.get('assigned_to')
+    if assignee == 'none':
+        cases = cases.filter(assigned_to__isnull=True)
+    elif assignee:
+        try:
+            cases = cases.filter(assigned_to_id=int(assignee))
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid assignee'}, status=400)
+
+    try:
+        fields = _requested_fields(request, CASE_SERIALIZER.default, CASE_SERIALIZER.fields)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = _decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            return JsonResponse({'success': False, 'error': 'Invalid cursor'}, status=400)
+        cases = cases.filter(
+            Q(created_at__lt=cursor_created_at) |
+            Q(created_at=cursor_created_at, id__lt=cursor_id)
+        )
+
+    # values() rows of just the requested columns; lookups come from the registry, created_at feeds the cursor
+    cases = CASE_SERIALIZER.values(cases, fields, ['created_at']).order_by('-created_at', '-id')
+
+    # Fetch one extra row to find out whether another page exists
+    page = list(cases[:page_size + 1])
+    next_cursor = None
+    if len(page) > page_size:
+        page = page[:page_size]
+        next_cursor = _encode_cursor(page[-1]['created_at'], page[-1]['id'])
+
+    cases_data = CASE_SERIALIZER.serialize(page, fields)
+
+    return json_response({'cases': cases_data, 'next_cursor': next_cursor})
+
+@login_required
+def get_case_changes(request):
+    """
+    Cases, notes and attachments written or deleted since a change token, so clients can
+    keep a local cache current; without ?since= only the current token is returned
     """
-    cases = UATCase.objects.filter(requestor=request.user).order_by('-created_at')
+    changes = CaseChange.objects.filter(**_change_log_scope(request.user))
     
-    cases_data = []
-    for case in cases:
-        cases_data.append({
-            'id': case.id,
-            'subject': case.subject,
-            'priority': case.priority,
-            'environment': case.environment,
-            'case_type': case.case_type,
-            'description': case.description,
-            'reproduction_steps': case.reproduction_steps,
-            'status': case.status,
-            'requestor': case.requestor.username,
-            'company': case.company.name,
-            'created_at': case.created_at.isoformat(),
-            'creatio_id': case.creatio_id,
-            'sync_status': case.sync_status,
-            'notes_count': case.notes.count(),
-            'attachments_count': case.attachments.count()
-        })
+    # Entries younger than the settle window may still have lower-ID neighbours in flight
+    settle_seconds = getattr(settings, 'CASE_CHANGES_SETTLE_SECONDS', 2)
+    changes = changes.filter(changed_at__lte=timezone.now() - timedelta(seconds=settle_seconds))
+    
+    since = request.GET.get('since')
+    if since is None:
+        latest = changes.order_by('-id').values_list('id', flat=True).first()
+        return JsonResponse({'success': True, 'token': str(latest or 0)})
+    try:
+        since = int(since)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid token'}, status=400)
+    
+    oldest = CaseChange.objects.order_by('id').values_list('id', flat=True).first()
+    if since and oldest and since < oldest - 1:
+        return JsonResponse({'success': False, 'error': 'Token expired, reload the case list'}, status=410)
+    
+    entries = list(changes.filter(id__gt=since).order_by('id').values_list(
+        'id', 'object_type', 'object_id', 'action'
+    )[:CHANGES_PAGE_SIZE + 1])
+    has_more = len(entries) > CHANGES_PAGE_SIZE
+    entries = entries[:CHANGES_PAGE_SIZE]
+    
+    # Only the last action per object matters
+    latest_actions = {(object_type, object_id): action for _, object_type, object_id, action in entries}
+    upserted = {object_type: set() for object_type, _ in CaseChange.OBJECT_TYPES}
+    deleted = {object_type: set() for object_type, _ in CaseChange.OBJECT_TYPES}
+    for (object_type, object_id), action in latest_actions.items():
+        (upserted if action == 'upsert' else deleted)[object_type].add(object_id)
+    
+    cases_data = CASE_SERIALIZER.serialize(CASE_SERIALIZER.values(UATCase.objects.filter(id__in=upserted['case'])))
+    # Feed rows carry every field, case_id included
+    note_fields = tuple(NOTE_SERIALIZER.fields)
+    notes_data = NOTE_SERIALIZER.serialize(
+        NOTE_SERIALIZER.values(Note.objects.filter(id__in=upserted['note']), note_fields), note_fields
+    )
+    attachment_fields = tuple(ATTACHMENT_SERIALIZER.fields)
+    attachments_data = ATTACHMENT_SERIALIZER.serialize(
+        ATTACHMENT_SERIALIZER.values(Attachment.objects.filter(id__in=upserted['attachment']), attachment_fields),
+        attachment_fields
+    )
+    
+    # Rows removed after their last logged write are reported as deleted too
+    for object_type, rows in (('case', cases_data), ('note', notes_data), ('attachment', attachments_data)):
+        deleted[object_type] |= upserted[object_type] - {row['id'] for row in rows}
+    
+    return json_response({
+        'success': True,
+        'token': str(entries[-1][0] if entries else since),
+        'has_more': has_more,
+        'cases': cases_data,
+        'notes': notes_data,
+        'attachments': attachments_data,
+        'deleted': {
+            'cases': sorted(deleted['case']),
+            'notes': sorted(deleted['note']),
+            'attachments': sorted(deleted['attachment'])
+        }
+    })
+
+@login_required
+def case_events(request):
+    """
+    Server-Sent Events stream of case, note and attachment changes in the user's scope;
+    reconnecting clients resume from Last-Event-ID or ?since=
+    """
+    scope = _change_log_scope(request.user)
+    changes = CaseChange.objects.filter(**scope)
     
-    return JsonResponse({'cases': cases_data})
+    since = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    if since is None:
+        settle_seconds = getattr(settings, 'CASE_CHANGES_SETTLE_SECONDS', 2)
+        since = changes.filter(
+            changed_at__lte=timezone.now() - timedelta(seconds=settle_seconds)
+        ).order_by('-id').values_list('id', flat=True).first() or 0
+    else:
+        try:
+            since = int(since)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Invalid event ID'}, status=400)
+        
+        oldest = CaseChange.objects.order_by('id').values_list('id', flat=True).first()
+        if since and oldest and since < oldest - 1:
+            return JsonResponse({'success': False, 'error': 'Event ID expired, reload the case list'}, status=410)
+    
+    # Every open stream holds a server thread, so each process serves a bounded number of them
+    stream = open_stream(scope, since)
+    if stream is None:
+        response = JsonResponse({'success': False, 'error': 'Too many open event streams, retry shortly'}, status=503)
+        response['Retry-After'] = str(EVENTS_RETRY_MS // 1000)
+        return response
+    
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 @login_required
 def create_case(request):
@@ -107,128 +346,147 @@ def create_case(request):
         # Get company (in a real app, this would come from user's profile)
         company = Company.objects.first()  # For demo purposes
         
-        case = UATCase.objects.create(
-            subject=data.get('subject'),
-            description=data.get('description'),
-            reproduction_steps=data.get('reproduction_steps', ''),
-            priority=data.get('priority', 'medium'),
-            environment=data.get('environment'),
-            case_type=data.get('type', 'bug'),
-            requestor=request.user,
-            company=company
-        )
+        # Lookups arrive as values and are resolved to IDs without queries
+        lookups = {
+            'priority': data.get('priority', 'medium'),
+            'status': 'new',
+            'environment': data.get('environment'),
+            'case_type': data.get('type', 'bug'),
+        }
+        lookup_ids = {field: resolve_lookup_id(field, value) for field, value in lookups.items()}
+        for field, lookup_id in lookup_ids.items():
+            if lookup_id is None:
+                return JsonResponse({
+                    'success': False,
+                    'error': f'Invalid {field.replace("_", " ")}: {lookups[field]}'
+                }, status=400)
         
-        # Sync with Creatio
-        try:
-            creatio_service = CreatioService()
-            case_data = {
-                'subject': case.subject,
-                'description': case.description,
-                'priority': case.priority,
-                'status': case.status,
-                'case_type': case.case_type,
-                'reproduction_steps': case.reproduction_steps,
-                'created_at': case.created_at.isoformat(),
-            }
-            
-            result = creatio_service.create_case(case_data)
-            case.creatio_id = result.get('Id', f'CR-{case.id}')
-            case.sync_status = 'synced'
-            case.last_synced = timezone.now()
-            case.save()
-            
-            # Add system note about Creatio sync
-            Note.objects.create(
-                case=case,
-                author=request.user,
-                content=f'Case synchronized with Creatio. Case ID: {case.creatio_id}'
-            )
-            
-            logger.info(f'Successfully synced case {case.id} with Creatio')
-            
-        except Exception as e:
-            logger.error(f'Failed to sync case {case.id} with Creatio: {e}')
-            case.sync_status = 'pending'
-            case.save()
-            
-            # Add system note about sync failure
-            Note.objects.create(
-                case=case,
-                author=request.user,
-                content=f'Failed to sync with Creatio. Will retry later. Error: {str(e)}'
+        # The Creatio push happens in run_sync_worker, queued in the same transaction
+        with transaction.atomic():
+            case = UATCase.objects.create(
+                subject=data.get('subject'),
+                description=data.get('description'),
+                reproduction_steps=data.get('reproduction_steps', ''),
+                priority_id=lookup_ids['priority'],
+                status_id=lookup_ids['status'],
+                environment_id=lookup_ids['environment'],
+                case_type_id=lookup_ids['case_type'],
+                requestor=request.user,
+                company=company
             )
+            SyncOutbox.enqueue(case, 'create_case')
         
-        return JsonResponse({
-            'success': True,
-            'case': {
-                'id': case.id,
-                'subject': case.subject,
-                'priority': case.priority,
-                'environment': case.environment,
-                'case_type': case.case_type,
-                'description': case.description,
-                'reproduction_steps': case.reproduction_steps,
-                'status': case.status,
-                'requestor': case.requestor.username,
-                'company': case.company.name,
-                'created_at': case.created_at.isoformat(),
-                'creatio_id': case.creatio_id,
-                'sync_status': case.sync_status,
-                'notes': [],
-                'attachments': []
-            }
-        })
+        # Serialized from memory; requestor and company are already loaded
+        case_data = CASE_SERIALIZER.serialize_instance(case, ('case_number', *CASE_DETAIL_FIELDS[:-2]))
+        return json_response({'success': True, 'case': {**case_data, 'notes': [], 'attachments': []}})
     
     return JsonResponse({'success': False, 'error': 'Invalid request method'})
 
 @login_required
-def get_case_details(request, case_id):
+def export_cases(request):
     """
-    Get details for a specific case
+    Stream the user's cases (the whole company for admins) with their notes as CSV or JSONL;
+    ?fields= picks the columns
     """
-    case = get_object_or_404(UATCase, id=case_id, requestor=request.user)
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': f'Unsupported format: {export_format}'}, status=400)
     
-    # Get notes for the case
-    notes = case.notes.all().order_by('-created_at')
-    notes_data = []
-    for note in notes:
-        notes_data.append({
-            'id': note.id,
-            'author': note.author.username,
-            'content': note.content,
-            'timestamp': note.created_at.isoformat()
-        })
+    try:
+        columns = parse_export_columns(request.GET.get('fields'))
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    if hasattr(request.user, 'profile'):
+        cases = get_scoped_cases(request.user, request.user.profile)
+    else:
+        # Users without a profile export their own cases
+        cases = UATCase.objects.filter(requestor=request.user)
+    stream, content_type = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(
+        stream(iter_export_rows(cases, columns=columns), columns), content_type=content_type
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="cases-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"'
+    )
+    return response
+
+@login_required
+def import_cases(request):
+    """
+    Bulk import a CSV or JSONL file of cases into the admin's company
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'})
     
-    # Get attachments for the case
-    attachments = case.attachments.all()
-    attachments_data = []
-    for attachment in attachments:
-        attachments_data.append({
-            'id': attachment.id,
-            'filename': attachment.filename,
-            'uploaded_by': attachment.uploaded_by.username,
-            'uploaded_at': attachment.uploaded_at.isoformat()
+    if not (hasattr(request.user, 'profile') and request.user.profile.is_admin):
+        return JsonResponse({
+            'success': False,
+            'error': 'Admin access required'
+        }, status=403)
+    
+    if 'file' not in request.FILES:
+        return JsonResponse({'success': False, 'error': 'No file provided'})
+    
+    uploaded_file = request.FILES['file']
+    import_format = request.POST.get('format') or os.path.splitext(uploaded_file.name)[1].lstrip('.').lower()
+    if import_format not in IMPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': f'Unsupported format: {import_format}'}, status=400)
+    
+    try:
+        importer = CaseImporter(
+            request.user.profile.company, request.user,
+            dry_run=request.POST.get('dry_run') in ('1', 'true')
+        )
+        started = time.monotonic()
+        lines = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+        importer.run(parse_import_rows(lines, import_format))
+        
+        return JsonResponse({
+            'success': True,
+            'imported': importer.imported,
+            'rejected': len(importer.errors),
+            'errors': [
+                {'line': line_number, 'error': error} for line_number, error in importer.errors[:100]
+            ],
+            'seconds': round(time.monotonic() - started, 2)
+        })
+    except Exception as e:
+        logger.error(f'Error importing cases: {e}')
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
         })
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_case_detail_etag)
+def get_case_details(request, case_id):
+    """
+    Get details for a specific case; ?fields= limits the columns read and the keys returned
+    """
+    try:
+        fields = _requested_fields(request, CASE_DETAIL_FIELDS, {*CASE_SERIALIZER.fields, 'notes', 'attachments'})
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     
-    case_data = {
-        'id': case.id,
-        'subject': case.subject,
-        'priority': case.priority,
-        'environment': case.environment,
-        'case_type': case.case_type,
-        'description': case.description,
-        'reproduction_steps': case.reproduction_steps,
-        'status': case.status,
-        'requestor': case.requestor.username,
-        'company': case.company.name,
-        'created_at': case.created_at.isoformat(),
-        'creatio_id': case.creatio_id,
-        'sync_status': case.sync_status,
-        'notes': notes_data,
-        'attachments': attachments_data
-    }
+    case_fields = [field for field in fields if field in CASE_SERIALIZER.fields]
+    case = get_object_or_404(
+        CASE_SERIALIZER.values(UATCase.objects.filter(requestor=request.user), case_fields), id=case_id
+    )
+    case_data = CASE_SERIALIZER.serialize([case], case_fields)[0]
     
-    return JsonResponse({'case': case_data})
+    # Notes and attachments are only queried when asked for
+    if 'notes' in fields:
+        case_data['notes'] = NOTE_SERIALIZER.serialize(
+            NOTE_SERIALIZER.values(Note.objects.filter(case_id=case_id)).order_by('-created_at')
+        )
+    if 'attachments' in fields:
+        case_data['attachments'] = ATTACHMENT_SERIALIZER.serialize(
+            ATTACHMENT_SERIALIZER.values(Attachment.objects.filter(case_id=case_id))
+        )
+    
+    return json_response({'case': case_data})
 
 @login_required
 def update_case_field(request, case_id):
@@ -242,45 +500,31 @@ def update_case_field(request, case_id):
         field = data.get('field')
         value = data.get('value')
         
+        # Lookup fields are set by value
+        lookup_fields = [lookup_field for lookup_field, _, _ in LOOKUP_MODELS]
+        if field in lookup_fields:
+            lookup_id = resolve_lookup_id(field, value)
+            if lookup_id is None:
+                return JsonResponse({'success': False, 'error': f'Invalid {field.replace("_", " ")}: {value}'})
+            field, value = f'{field}_id', lookup_id
+        
         # Update the field
         if hasattr(case, field):
-            setattr(case, field, value)
-            case.save()
-            
-            # Add system note for status changes
-            if field == 'status':
-                Note.objects.create(
-                    case=case,
-                    author=request.user,
-                    content=f'Status changed to: {value}'
-                )
-            
-            # Sync with Creatio
-            try:
-                creatio_service = CreatioService()
-                case_data = {
-                    'subject': case.subject,
-                    'description': case.description,
-                    'priority': case.priority,
-                    'status': case.status,
-                    'case_type': case.case_type,
-                    'reproduction_steps': case.reproduction_steps,
-                }
-                
-                if case.creatio_id:
-                    creatio_service.update_case(case.creatio_id, case_data)
-                    case.sync_status = 'synced'
-                    case.last_synced = timezone.now()
-                    case.save()
-                    logger.info(f'Successfully updated case {case.id} in Creatio')
-                else:
-                    case.sync_status = 'pending'
-                    case.save()
-                    
-            except Exception as e:
-                logger.error(f'Failed to sync case update with Creatio: {e}')
+            with transaction.atomic():
+                setattr(case, field, value)
                 case.sync_status = 'pending'
                 case.save()
+                
+                # Add system note for status changes
+                if field == 'status_id':
+                    Note.objects.create(
+                        case=case,
+                        author=request.user,
+                        content=f'Status changed to: {get_lookup("status", value).name}'
+                    )
+                
+                # Sync with Creatio in the background
+                SyncOutbox.enqueue(case, 'update_case')
             
             return JsonResponse({'success': True})
         else:
@@ -288,6 +532,111 @@ def update_case_field(request, case_id):
     
     return JsonResponse({'success': False, 'error': 'Invalid request method'})
 
+@login_required
+def bulk_update_cases(request):
+    """
+    Set status, priority, environment, case type or assignee on many cases with one UPDATE
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'})
+    
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON data'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'success': False, 'error': 'Expected a JSON object'}, status=400)
+    case_ids = data.get('case_ids') or []
+    fields = data.get('fields') or {}
+    if not isinstance(case_ids, list) or not all(isinstance(case_id, int) for case_id in case_ids):
+        return JsonResponse({'success': False, 'error': 'case_ids must be a list of IDs'}, status=400)
+    if len(case_ids) > BULK_UPDATE_MAX_CASES:
+        return JsonResponse({
+            'success': False,
+            'error': f'At most {BULK_UPDATE_MAX_CASES} cases can be updated at once'
+        }, status=400)
+    if not isinstance(fields, dict) or not fields or not set(fields) <= BULK_UPDATE_FIELDS:
+        return JsonResponse({
+            'success': False,
+            'error': f'fields must set some of: {", ".join(sorted(BULK_UPDATE_FIELDS))}'
+        }, status=400)
+    
+    # Users without a profile can triage their own cases but not assign them to anyone
+    user_profile = request.user.profile if hasattr(request.user, 'profile') else None
+    updates = {}
+    changes = []
+    for field, value in fields.items():
+        if field == 'assigned_to':
+            assignee = None
+            if value is not None:
+                if not isinstance(value, int) or isinstance(value, bool):
+                    return JsonResponse({'success': False, 'error': 'assigned_to must be a user ID or null'}, status=400)
+                if user_profile is not None:
+                    assignee = User.objects.filter(id=value, profile__company=user_profile.company_id).first()
+                if assignee is None:
+                    return JsonResponse({'success': False, 'error': 'Cannot assign cases to that user'}, status=400)
+            updates['assigned_to_id'] = assignee.id if assignee else None
+            changes.append(f'Case assigned to: {assignee.get_full_name() if assignee else "Unassigned"}')
+        else:
+            lookup_id = resolve_lookup_id(field, value)
+            if lookup_id is None:
+                return JsonResponse({'success': False, 'error': f'Invalid {field.replace("_", " ")}: {value}'}, status=400)
+            updates[f'{field}_id'] = lookup_id
+            changes.append(f'{field.replace("_", " ").capitalize()} changed to: {get_lookup(field, lookup_id).name}')
+    
+    # Admins triage the whole company, everyone else their own cases
+    if user_profile is not None and user_profile.is_admin:
+        cases = UATCase.objects.filter(company=user_profile.company_id)
+    else:
+        cases = UATCase.objects.filter(requestor=request.user)
+    
+    now = timezone.now()
+    with transaction.atomic():
+        rows = cases.select_for_update().filter(
+            id__in=case_ids
+        ).values_list('id', 'requestor_id', *UATCase.STATS_BUCKET_FIELDS)
+        old_buckets = {row[0]: row[2:] for row in rows}
+        scopes = {row[0]: (row[0], row[2], row[1]) for row in rows}
+        updated_ids = list(old_buckets)
+        
+        # queryset.update() bypasses save() and the Note signals, so counters move here
+        UATCase.objects.filter(id__in=updated_ids).update(
+            **updates,
+            sync_status='pending',
+            updated_at=now,
+            notes_count=F('notes_count') + 1,
+            last_activity_at=now
+        )
+        
+        stats_deltas = Counter()
+        for company_id, status_id, priority_id, sync_status in old_buckets.values():
+            stats_deltas[(company_id, status_id, priority_id, sync_status)] -= 1
+            stats_deltas[(
+                company_id,
+                updates.get('status_id', status_id),
+                updates.get('priority_id', priority_id),
+                'pending'
+            )] += 1
+        CaseStats.apply_deltas(stats_deltas)
+        
+        notes = Note.objects.bulk_create([
+            Note(case_id=case_id, author=request.user, content='; '.join(changes), created_at=now)
+            for case_id in updated_ids
+        ])
+        CaseChange.record(
+            [CaseChange.for_case(scopes[case_id], 'case', case_id) for case_id in updated_ids] +
+            [CaseChange.for_case(scopes[note.case_id], 'note', note.id, event='note_added') for note in notes]
+        )
+        
+        # One coalesced outbox batch for run_sync_worker
+        SyncOutbox.enqueue_updates(updated_ids)
+    
+    return JsonResponse({
+        'success': True,
+        'updated': len(updated_ids),
+        'skipped': [case_id for case_id in case_ids if case_id not in old_buckets]
+    })
+
 @login_required
 def add_note(request, case_id):
     """
@@ -299,34 +648,15 @@ def add_note(request, case_id):
         
         note_content = data.get('content')
         if note_content:
-            note = Note.objects.create(
-                case=case,
-                author=request.user,
-                content=note_content
-            )
-            
-            # Sync note with Creatio
-            try:
-                creatio_service = CreatioService()
-                if case.creatio_id:
-                    comment_data = {
-                        'content': note.content,
-                        'author': note.author.username,
-                        'created_at': note.created_at.isoformat(),
-                    }
-                    creatio_service.add_case_comment(case.creatio_id, comment_data)
-                    case.sync_status = 'synced'
-                    case.last_synced = timezone.now()
-                    case.save()
-                    logger.info(f'Successfully synced note for case {case.id} with Creatio')
-                else:
-                    case.sync_status = 'pending'
-                    case.save()
-                    
-            except Exception as e:
-                logger.error(f'Failed to sync note with Creatio: {e}')
-                case.sync_status = 'pending'
-                case.save()
+            with transaction.atomic():
+                note = Note.objects.create(
+                    case=case,
+                    author=request.user,
+                    content=note_content
+                )
+                
+                # Sync note with Creatio in the background
+                SyncOutbox.enqueue(case, 'add_comment', note=note)
             
             return JsonResponse({
                 'success': True,
@@ -396,6 +726,8 @@ def sync_with_creatio(request):
             pending_cases = UATCase.objects.filter(
                 requestor=request.user, 
                 sync_status='pending'
+            ).exclude(
+                outbox_entries__status__in=['pending', 'processing']  # run_sync_worker owns these
             )
             
             synced_count = 0
@@ -406,9 +738,9 @@ def sync_with_creatio(request):
                     case_data = {
                         'subject': case.subject,
                         'description': case.description,
-                        'priority': case.priority,
-                        'status': case.status,
-                        'case_type': case.case_type,
+                        'priority': get_lookup('priority', case.priority_id).name,
+                        'status': get_lookup('status', case.status_id).name,
+                        'case_type': get_lookup('case_type', case.case_type_id).name,
                         'reproduction_steps': case.reproduction_steps,
                         'created_at': case.created_at.isoformat(),
                     }
@@ -419,9 +751,9 @@ def sync_with_creatio(request):
                         result = creatio_service.create_case(case_data)
                         case.creatio_id = result.get('Id', f'CR-{case.id}')
                     
-                    case.sync_status = 'synced'
-                    case.last_synced = timezone.now()
-                    case.save()
+                    case.save_sync_state(
+                        creatio_id=case.creatio_id, sync_status='synced', sync_error=None, last_synced=timezone.now()
+                    )
                     synced_count += 1
                     
                 except Exception as e:
@@ -453,29 +785,19 @@ def get_dashboard_stats(request):
     
     stats = {
         'total_cases': user_cases.count(),
-        'open_cases': user_cases.filter(status__in=['new', 'in-progress']).count(),
-        'high_priority': user_cases.filter(priority='high').count(),
-        'resolved_cases': user_cases.filter(status__in=['resolved', 'closed']).count(),
+        'open_cases': user_cases.filter(status__value__in=['new', 'in-progress']).count(),
+        'high_priority': user_cases.filter(priority__value='high').count(),
+        'resolved_cases': user_cases.filter(status__value__in=['resolved', 'closed']).count(),
         'pending_sync': user_cases.filter(sync_status='pending').count(),
         'synced_cases': user_cases.filter(sync_status='synced').count(),
     }
     
     # Recent activity
-    recent_cases = user_cases.order_by('-updated_at')[:5]
-    recent_activity = []
-    
-    for case in recent_cases:
-        recent_activity.append({
-            'id': case.id,
-            'subject': case.subject,
-            'status': case.status,
-            'priority': case.priority,
-            'environment': case.environment,
-            'updated_at': case.updated_at.isoformat(),
-            'sync_status': case.sync_status
-        })
+    recent_activity = RECENT_ACTIVITY_SERIALIZER.serialize(
+        RECENT_ACTIVITY_SERIALIZER.values(user_cases).order_by('-updated_at')[:5]
+    )
     
-    return JsonResponse({
+    return json_response({
         'stats': stats,
         'recent_activity': recent_activity
     })
@@ -531,7 +853,8 @@ def health_check(request):
             'database': 'connected',
             'creatio': {
                 'status': 'connected' if creatio_success else 'disconnected',
-                'message': creatio_message
+                'message': creatio_message,
+                'transport': get_transport_metrics()
             }
         })
     except Exception as e:
@@ -543,48 +866,20 @@ def health_check(request):
 @login_required
 def get_lookups(request):
     """
-    Get all lookup data for dropdowns
+    Get all lookup data for dropdowns; repeat loads are answered with 304 from the version ETag
     """
     try:
-        lookups = {
-            'priorities': [
-                {
-                    'id': p.id,
-                    'name': p.name,
-                    'value': p.value,
-                    'color': p.color
-                } for p in Priority.objects.filter(is_active=True)
-            ],
-            'statuses': [
-                {
-                    'id': s.id,
-                    'name': s.name,
-                    'value': s.value,
-                    'color': s.color
-                } for s in Status.objects.filter(is_active=True)
-            ],
-            'environments': [
-                {
-                    'id': e.id,
-                    'name': e.name,
-                    'value': e.value,
-                    'color': e.color
-                } for e in Environment.objects.filter(is_active=True)
-            ],
-            'caseTypes': [
-                {
-                    'id': ct.id,
-                    'name': ct.name,
-                    'value': ct.value,
-                    'color': ct.color
-                } for ct in CaseType.objects.filter(is_active=True)
-            ]
-        }
-        
-        return JsonResponse({
-            'success': True,
-            'lookups': lookups
-        })
+        version = get_lookup_version()
+        etag = get_lookup_etag(version)
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            registry = get_lookup_registry()
+            etag = get_lookup_etag(registry.version)
+            response = HttpResponse(get_lookups_payload(registry), content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
     except Exception as e:
         logger.error(f'Error loading lookups: {e}')
         return JsonResponse({
@@ -747,87 +1042,12 @@ def get_enhanced_dashboard_stats(request):
     Get enhanced dashboard statistics with more details
     """
     try:
-        user_profile = request.user.profile
-        
-        # Base query - filter by company for multi-tenancy
-        if user_profile.is_admin:
-            # Admin can see all company cases
-            base_cases = UATCase.objects.filter(company=user_profile.company)
-        else:
-            # Regular users see only their cases
-            base_cases = UATCase.objects.filter(requestor=request.user)
-        
-        # Calculate statistics
-        total_cases = base_cases.count()
-        new_cases = base_cases.filter(status__value='new').count()
-        in_progress_cases = base_cases.filter(status__value='in-progress').count()
-        resolved_cases = base_cases.filter(status__value='resolved').count()
-        closed_cases = base_cases.filter(status__value='closed').count()
-        cancelled_cases = base_cases.filter(status__value='cancelled').count()
-        reopened_cases = base_cases.filter(status__value='reopened').count()
-        
-        high_priority = base_cases.filter(priority__value='high').count()
-        pending_sync = base_cases.filter(sync_status='pending').count()
-        
-        # Recent activity
-        recent_cases = base_cases.order_by('-updated_at')[:10]
-        recent_activity = []
+        payload = get_dashboard_payload(request.user, request.user.profile)
         
-        for case in recent_cases:
-            recent_activity.append({
-                'id': case.id,
-                'case_number': case.case_number,
-                'subject': case.subject,
-                'status': case.status.name,
-                'priority': case.priority.name,
-                'environment': case.environment.name,
-                'requestor': case.requestor.get_full_name() or case.requestor.username,
-                'assigned_to': case.assigned_to.get_full_name() if case.assigned_to else None,
-                'updated_at': case.updated_at.isoformat(),
-                'sync_status': case.sync_status
-            })
-        
-        # Status distribution for charts
-        status_distribution = []
-        for status in Status.objects.filter(is_active=True):
-            count = base_cases.filter(status=status).count()
-            if count > 0:
-                status_distribution.append({
-                    'name': status.name,
-                    'value': count,
-                    'color': status.color
-                })
-        
-        # Priority distribution
-        priority_distribution = []
-        for priority in Priority.objects.filter(is_active=True):
-            count = base_cases.filter(priority=priority).count()
-            if count > 0:
-                priority_distribution.append({
-                    'name': priority.name,
-                    'value': count,
-                    'color': priority.color
-                })
-        
-        stats = {
-            'total_cases': total_cases,
-            'new_cases': new_cases,
-            'in_progress_cases': in_progress_cases,
-            'resolved_cases': resolved_cases,
-            'closed_cases': closed_cases,
-            'cancelled_cases': cancelled_cases,
-            'reopened_cases': reopened_cases,
-            'high_priority': high_priority,
-            'pending_sync': pending_sync,
-            'open_cases': new_cases + in_progress_cases + reopened_cases,
-            'status_distribution': status_distribution,
-            'priority_distribution': priority_distribution
-        }
-        
-        return JsonResponse({
+        return json_response({
             'success': True,
-            'stats': stats,
-            'recent_activity': recent_activity
+            'stats': payload['stats'],
+            'recent_activity': payload['recent_activity']
         })
     except Exception as e:
         logger.error(f'Error loading enhanced dashboard stats: {e}')
@@ -998,47 +1218,20 @@ def user_logout(request):
     }, status=405)
 
 # Dynamic Admin Panel Views
-from .models import DynamicPage, DynamicWidget, DynamicMenuItem, SystemSetting
+from .models import DynamicPage, SystemSetting, user_role_mask
+from .navigation import get_navigation, get_widgets
 
 def get_dynamic_pages(request):
     """
-    Get all active dynamic pages for navigation
+    Get all active dynamic pages and menu items for navigation, cached per role combination
     """
     try:
-        user_roles = []
-        if request.user.is_authenticated:
-            if hasattr(request.user, 'profile'):
-                if request.user.profile.is_admin:
-                    user_roles.append('admin')
-                if request.user.profile.can_assign_cases:
-                    user_roles.append('manager')
-            user_roles.append('user')
-        
-        pages = DynamicPage.objects.filter(is_active=True, show_in_menu=True)
-        
-        pages_data = []
-        for page in pages:
-            # Check role permissions
-            if page.allowed_roles:
-                allowed_roles = [role.strip() for role in page.allowed_roles.split(',')]
-                if not any(role in user_roles for role in allowed_roles):
-                    continue
-            
-            # Check login requirement
-            if page.requires_login and not request.user.is_authenticated:
-                continue
-            
-            pages_data.append({
-                'id': page.id,
-                'title': page.title,
-                'slug': page.slug,
-                'icon': page.icon,
-                'menu_order': page.menu_order
-            })
+        navigation = get_navigation(user_role_mask(request.user))
         
         return JsonResponse({
             'success': True,
-            'pages': pages_data
+            'pages': navigation['pages'],
+            'menu_items': navigation['menu_items']
         })
         
     except Exception as e:
@@ -1062,22 +1255,12 @@ def get_dynamic_page(request, slug):
                 'error': 'Login required'
             }, status=401)
         
-        # Check role permissions
-        if page.allowed_roles and request.user.is_authenticated:
-            user_roles = []
-            if hasattr(request.user, 'profile'):
-                if request.user.profile.is_admin:
-                    user_roles.append('admin')
-                if request.user.profile.can_assign_cases:
-                    user_roles.append('manager')
-            user_roles.append('user')
-            
-            allowed_roles = [role.strip() for role in page.allowed_roles.split(',')]
-            if not any(role in user_roles for role in allowed_roles):
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Access denied'
-                }, status=403)
+        # Check role permissions against the mask parsed when the page was saved
+        if request.user.is_authenticated and not page.allows(user_role_mask(request.user)):
+            return JsonResponse({
+                'success': False,
+                'error': 'Access denied'
+            }, status=403)
         
         return JsonResponse({
             'success': True,
@@ -1099,7 +1282,7 @@ def get_dynamic_page(request, slug):
 
 def get_dynamic_widgets(request):
     """
-    Get dashboard widgets for current user
+    Get dashboard widgets for current user, cached per role combination
     """
     try:
         if not request.user.is_authenticated:
@@ -1108,37 +1291,9 @@ def get_dynamic_widgets(request):
                 'error': 'Login required'
             }, status=401)
         
-        user_roles = []
-        if hasattr(request.user, 'profile'):
-            if request.user.profile.is_admin:
-                user_roles.append('admin')
-            if request.user.profile.can_assign_cases:
-                user_roles.append('manager')
-        user_roles.append('user')
-        
-        widgets = DynamicWidget.objects.filter(is_active=True)
-        
-        widgets_data = []
-        for widget in widgets:
-            # Check role permissions
-            if widget.allowed_roles:
-                allowed_roles = [role.strip() for role in widget.allowed_roles.split(',')]
-                if not any(role in user_roles for role in allowed_roles):
-                    continue
-            
-            widgets_data.append({
-                'id': widget.id,
-                'title': widget.title,
-                'widget_type': widget.widget_type,
-                'content': widget.content,
-                'css_classes': widget.css_classes,
-                'width': widget.width,
-                'order': widget.order
-            })
-        
         return JsonResponse({
             'success': True,
-            'widgets': widgets_data
+            'widgets': get_widgets(user_role_mask(request.user))
         })
         
     except Exception as e: